@@ -0,0 +1,26 @@
+import io
+
+from PIL import Image, ImageOps
+
+# Longest side in pixels for each rendition served next to the original photo
+RENDITION_SIZES = {"thumbnail": 640, "medium": 1280}
+RENDITION_QUALITY = 80
+
+# Runs in a worker process, so it must stay importable without the rest of the backend
+def render_renditions(data: bytes, sizes: dict) -> dict:
+    # Corrupt or truncated files raise OSError once the pixels are decoded, and retrying won't fix them
+    try:
+        with Image.open(io.BytesIO(data)) as original:
+            # Phones store rotation in EXIF, which is dropped along with the rest of the metadata
+            image = ImageOps.exif_transpose(original).convert("RGB")
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Not a renderable image: {e}")
+
+    renditions = {}
+    for name, max_side in sizes.items():
+        resized = image.copy()
+        resized.thumbnail((max_side, max_side), Image.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, "JPEG", quality=RENDITION_QUALITY, optimize=True, progressive=True)
+        renditions[name] = output.getvalue()
+    return renditions
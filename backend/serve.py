@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import uvicorn
+
+def available_cpus():
+    """CPUs this process may run on, which respects container and taskset limits"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with one uvicorn worker process per core")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", available_cpus())),
+                        help="Worker processes (default: WEB_CONCURRENCY or the available CPU count)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.environ.get("GRACEFUL_SHUTDOWN_SECONDS", "30")),
+                        help="Seconds a worker waits for in-flight requests before shutting down")
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    parser.add_argument("--forwarded-allow-ips", default=os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+                        help="Comma-separated proxy addresses whose X-Forwarded-For is trusted, or * to trust any")
+    args = parser.parse_args()
+
+    # Every worker opens its own Mongo pool, so the server sees up to workers * MONGO_MAX_POOL_SIZE connections.
+    # Seeding and index creation run once across all workers behind the startup lease in server.py.
+    print(f"🚀 Starting {args.workers} workers on {args.host}:{args.port}")
+    uvicorn.run(
+        "server:app",
+        app_dir=str(Path(__file__).parent),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,311 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status
+from fastapi import FastAPI, APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pymongo.monitoring import CommandListener, ConnectionPoolListener
 import os
+import re
+import math
+import bisect
+import hashlib
+import socket
+import time
+import asyncio
 import logging
+import functools
+import threading
+import contextvars
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
+from contextlib import asynccontextmanager
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone, timedelta
+from renditions import RENDITION_SIZES, render_renditions
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+# Default per-operation time limit, sent to the server as maxTimeMS (unset means no limit)
+MONGO_MAX_TIME_MS = os.environ.get('MONGO_MAX_TIME_MS')
+HEALTH_MAX_POOL_WAITERS = int(os.environ.get('HEALTH_MAX_POOL_WAITERS', '10'))
+HEALTH_PING_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', '2'))
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '10'))
+NOTIFICATION_READ_TTL_DAYS = int(os.environ.get('NOTIFICATION_READ_TTL_DAYS', '30'))
+NOTIFICATION_MAX_PER_STUDENT = int(os.environ.get('NOTIFICATION_MAX_PER_STUDENT', '100'))
+NOTIFICATION_ARCHIVE_TTL_DAYS = int(os.environ.get('NOTIFICATION_ARCHIVE_TTL_DAYS', '365'))
+NOTIFICATION_RETENTION_INTERVAL_SECONDS = int(os.environ.get('NOTIFICATION_RETENTION_INTERVAL_SECONDS', '3600'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '5'))
+JOB_VISIBILITY_TIMEOUT_SECONDS = int(os.environ.get('JOB_VISIBILITY_TIMEOUT_SECONDS', '60'))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get('JOB_POLL_INTERVAL_SECONDS', '1'))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+JOB_DRAIN_TIMEOUT_SECONDS = float(os.environ.get('JOB_DRAIN_TIMEOUT_SECONDS', '20'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '512'))
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', '30'))
+VERSION_POLL_INTERVAL_SECONDS = float(os.environ.get('VERSION_POLL_INTERVAL_SECONDS', '0.5'))
+# "documents" keeps one document per chat message; "buckets" groups them per team in messageBuckets
+MESSAGE_STORAGE = os.environ.get('MESSAGE_STORAGE', 'documents')
+MESSAGE_BUCKET_SIZE = int(os.environ.get('MESSAGE_BUCKET_SIZE', '200'))
+DATE_MIGRATION_BATCH_SIZE = int(os.environ.get('DATE_MIGRATION_BATCH_SIZE', '500'))
+DATE_MIGRATION_PAUSE_SECONDS = float(os.environ.get('DATE_MIGRATION_PAUSE_SECONDS', '0.05'))
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+RENDITION_WORKERS = int(os.environ.get('RENDITION_WORKERS', '2'))
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', '64'))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_SECONDS', '2'))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get('ADMISSION_RETRY_AFTER_SECONDS', '2'))
+RATE_LIMITS_ENABLED = os.environ.get('RATE_LIMITS_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get('RATE_LIMIT_MAX_CLIENTS', '100000'))
+ANALYTICS_REFRESH_INTERVAL_SECONDS = int(os.environ.get('ANALYTICS_REFRESH_INTERVAL_SECONDS', '300'))
+ANALYTICS_DRAIN_BUDGET_SECONDS = float(os.environ.get('ANALYTICS_DRAIN_BUDGET_SECONDS', '10'))
+ANALYTICS_MARK_OVERLAP_SECONDS = int(os.environ.get('ANALYTICS_MARK_OVERLAP_SECONDS', '60'))
+
+class PoolStats(ConnectionPoolListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+    
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                "open": self.open,
+                "checkedOut": self.checked_out,
+                "waiting": self.waiting,
+                "checkoutFailures": self.checkout_failures,
+                "maxPoolSize": MONGO_MAX_POOL_SIZE
+            }
+    
+    def connection_created(self, event):
+        self._add(open=1)
+    
+    def connection_closed(self, event):
+        self._add(open=-1)
+    
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+    
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, checked_out=1)
+    
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, checkout_failures=1)
+    
+    def connection_checked_in(self, event):
+        self._add(checked_out=-1)
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+
+def query_shape(value):
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{key}:{query_shape(value[key])}" for key in sorted(value)) + "}"
+    if isinstance(value, list):
+        return "[" + (query_shape(value[0]) if value else "") + "]"
+    return "?"
+
+class QueryTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = 0
+        self.duration_micros = 0
+        self.shapes = {}
+    
+    def started(self, shape):
+        with self._lock:
+            self.commands += 1
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+    
+    def finished(self, duration_micros):
+        with self._lock:
+            self.duration_micros += duration_micros
+
+current_query_tracker = contextvars.ContextVar("current_query_tracker", default=None)
+
+class CommandAccounting(CommandListener):
+    # Motor copies the caller's context into its executor threads, so the
+    # tracker set by the request middleware is visible here
+    def started(self, event):
+        tracker = current_query_tracker.get()
+        if tracker is None:
+            return
+        name = event.command_name
+        arguments = {
+            key: value for key, value in event.command.items()
+            if key != name and not key.startswith("$") and key not in ("lsid", "txnNumber")
+        }
+        tracker.started(f"{name} {event.command.get(name)} {query_shape(arguments)}")
+    
+    def succeeded(self, event):
+        tracker = current_query_tracker.get()
+        if tracker is not None:
+            tracker.finished(event.duration_micros)
+    
+    def failed(self, event):
+        tracker = current_query_tracker.get()
+        if tracker is not None:
+            tracker.finished(event.duration_micros)
 
-app = FastAPI()
+mongo_url = os.environ['MONGO_URL']
+pool_stats = PoolStats()
+client_options = {
+    "maxPoolSize": MONGO_MAX_POOL_SIZE,
+    "minPoolSize": MONGO_MIN_POOL_SIZE,
+    "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    # Dates come back as UTC-aware datetimes so they serialize with an offset
+    "tz_aware": True,
+    "event_listeners": [pool_stats, CommandAccounting()]
+}
+if MONGO_MAX_TIME_MS:
+    client_options["timeoutMS"] = int(MONGO_MAX_TIME_MS)
+# Each worker process opens its own client from the lifespan; see connect_db
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+def connect_db() -> AsyncIOMotorClient:
+    global client, db
+    if client is None:
+        client = AsyncIOMotorClient(mongo_url, **client_options)
+        db = client[os.environ['DB_NAME']]
+    return client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global client, db, rendition_pool, seed_complete, draining, job_wakeup, admission_controller, dates_migrated_flag
+    connect_db()
+    background_tasks.append(asyncio.create_task(run_startup_tasks()))
+    background_tasks.append(asyncio.create_task(run_notification_retention()))
+    background_tasks.append(asyncio.create_task(watch_versions()))
+    background_tasks.append(asyncio.create_task(run_analytics_refresh()))
+    job_tasks = [asyncio.create_task(job_worker()) for _ in range(JOB_WORKERS)]
+    
+    yield
+    
+    # The server has stopped taking requests; let running jobs finish before closing the client
+    draining.set()
+    job_wakeup.set()
+    pending = set(job_tasks)
+    if job_tasks and seed_complete.is_set():
+        _, pending = await asyncio.wait(job_tasks, timeout=JOB_DRAIN_TIMEOUT_SECONDS)
+    if pending:
+        logger.warning(f"Cancelling {len(pending)} job workers; any claimed job is retried once its lease expires")
+    for task in [*background_tasks, *pending]:
+        task.cancel()
+    await asyncio.gather(*background_tasks, *pending, return_exceptions=True)
+    background_tasks.clear()
+    if rendition_pool is not None:
+        rendition_pool.shutdown(wait=False, cancel_futures=True)
+        rendition_pool = None
+    client.close()
+    # Another lifespan in this process, as in load_test.py or the benchmarks, starts from a clean slate
+    client = None
+    db = None
+    seed_complete = asyncio.Event()
+    draining = asyncio.Event()
+    job_wakeup = asyncio.Event()
+    admission_controller = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+    known_versions.clear()
+    response_cache.entries.clear()
+    dates_migrated_flag = False
+
+app = FastAPI(lifespan=lifespan)
 api_router = APIRouter(prefix="/api")
 
+ROLL_NUMBER_PATTERN = re.compile(r'^\d{4}BT(CSD|CS|AI)\d{3}$')
+
+# Older documents store dates as ISO strings; models accept both until migrate_dates_job has run
+def as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def created_range(created_after: Optional[datetime], created_before: Optional[datetime]) -> dict:
+    bounds = {}
+    if created_after:
+        bounds["$gte"] = created_after
+    if created_before:
+        bounds["$lt"] = created_before
+    return {"createdAt": bounds} if bounds else {}
+
+DATES_MIGRATION_ID = "dates"
+# Set once migrate_dates_job has recorded completion; it never goes back
+dates_migrated_flag = False
+
+async def dates_migrated() -> bool:
+    global dates_migrated_flag
+    if not dates_migrated_flag:
+        dates_migrated_flag = await migration_complete(DATES_MIGRATION_ID)
+    return dates_migrated_flag
+
+def mixed_date_pipeline(collection: str, query: dict, projection: dict, field: str, direction: int,
+                        skip: int = 0, limit: int = 0) -> list:
+    # BSON orders every string before every date and a date range never matches a string, so until the migration
+    # finishes, sorting and any filter on a date field use the converted values
+    dated = [key for key in query if key in DATE_FIELDS.get(collection, [])]
+    converted = {key: f"_{key}Date" for key in [field, *dated]}
+    pipeline = [
+        {"$match": {key: value for key, value in query.items() if key not in dated}},
+        {"$addFields": {
+            name: {"$convert": {"input": f"${key}", "to": "date", "onError": None}} for key, name in converted.items()
+        }}
+    ]
+    if dated:
+        pipeline.append({"$match": {converted[key]: query[key] for key in dated}})
+    pipeline += [
+        {"$sort": {converted[field]: direction}},
+        {"$unset": list(converted.values())},
+        {"$project": projection}
+    ]
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    return pipeline
+
+async def find_by_date(collection: str, query: dict, projection: dict, field: str, direction: int,
+                       skip: int = 0, limit: int = 0):
+    if await dates_migrated():
+        return db[collection].find(query, projection).sort(field, direction).skip(skip).limit(limit)
+    return db[collection].aggregate(
+        mixed_date_pipeline(collection, query, projection, field, direction, skip, limit), allowDiskUse=True
+    )
+
 class StudentCreate(BaseModel):
     name: str
     branch: str
@@ -36,7 +322,8 @@ class Student(BaseModel):
     interests: List[str] = Field(default_factory=list)
     teams: List[str] = Field(default_factory=list)
     isLeader: bool = False
-    createdAt: str
+    unreadNotifications: int = 0
+    createdAt: datetime
 
 class InterestUpdate(BaseModel):
     studentId: str
@@ -46,7 +333,7 @@ class Interest(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
     name: str
-    createdAt: str
+    createdAt: datetime
 
 class InterestCreate(BaseModel):
     name: str
@@ -67,7 +354,7 @@ class Team(BaseModel):
     members: List[dict] = Field(default_factory=list)
     interests: List[str]
     status: str = "pending"
-    createdAt: str
+    createdAt: datetime
 
 class JoinRequestCreate(BaseModel):
     teamId: str
@@ -81,21 +368,34 @@ class JoinRequest(BaseModel):
     studentId: str
     studentName: str
     status: str
-    createdAt: str
+    createdAt: datetime
 
 class RequestAction(BaseModel):
     requestId: str
     action: str
 
+class RequestBatchAction(BaseModel):
+    actions: List[RequestAction]
+
+class TeamAction(BaseModel):
+    teamId: str
+    action: str
+
+class TeamBatchAction(BaseModel):
+    actions: List[TeamAction]
+
 class AdminLogin(BaseModel):
     password: str
 
+class BatchDelete(BaseModel):
+    ids: List[str]
+
 # Leave Application Models
 class LeaveApplicationCreate(BaseModel):
     studentId: str
     reason: str
-    fromDate: str
-    toDate: str
+    fromDate: date
+    toDate: date
     documentUrl: Optional[str] = None
 
 class LeaveApplication(BaseModel):
@@ -106,33 +406,295 @@ class LeaveApplication(BaseModel):
     studentRollNumber: str
     studentBranch: str
     reason: str
-    fromDate: str
-    toDate: str
+    fromDate: date
+    toDate: date
     documentUrl: Optional[str] = None
     status: str = "pending"
     adminComment: Optional[str] = None
-    createdAt: str
+    createdAt: datetime
 
 class LeaveAction(BaseModel):
     leaveId: str
     action: str
     comment: Optional[str] = None
 
-@api_router.post("/auth/student", response_model=Student)
-async def student_login(input: StudentCreate):
-    import re
-    roll_pattern = r'^\d{4}BT(CSD|CS|AI)\d{3}$'
-    if not re.match(roll_pattern, input.rollNumber):
-        raise HTTPException(status_code=400, detail="Invalid roll number format. Use: YYYYBT(CS/AI/CSD)###")
+class LeaveBatchAction(BaseModel):
+    actions: List[LeaveAction]
+
+BATCH_ACTIONS = {"approve": "approved", "reject": "rejected"}
+
+# Returns the applicable items plus one result per id; a repeated id fails as a whole
+def split_batch(items, id_field, found_ids, not_found):
+    results = {}
+    valid = []
+    for item in items:
+        item_id = getattr(item, id_field)
+        if item_id in results:
+            results[item_id] = {"id": item_id, "success": False, "detail": "Duplicate item in batch"}
+        elif item_id not in found_ids:
+            results[item_id] = {"id": item_id, "success": False, "detail": not_found}
+        elif item.action not in BATCH_ACTIONS:
+            results[item_id] = {"id": item_id, "success": False, "detail": "Invalid action"}
+        else:
+            results[item_id] = {"id": item_id, "success": True, "status": BATCH_ACTIONS[item.action]}
+            valid.append(item)
+    valid = [item for item in valid if results[getattr(item, id_field)]["success"]]
+    return valid, results
+
+def batch_response(results):
+    succeeded = sum(1 for r in results.values() if r["success"])
+    return {"results": list(results.values()), "succeeded": succeeded, "failed": len(results) - succeeded}
+
+# This worker's view of collectionVersions, fed by its own writes and by watch_versions
+known_versions = {}
+# Only the keys cached loaders depend on are tracked; per-team keys would grow with every team
+cached_dependencies = set()
+
+def observe_version(doc: dict):
+    if doc["_id"] not in cached_dependencies:
+        return
+    current = known_versions.get(doc["_id"])
+    if current is None or current[0] != doc["epoch"] or current[1] < doc["version"]:
+        known_versions[doc["_id"]] = (doc["epoch"], doc["version"])
+
+# Collection versions back the ETags and response cache of read endpoints; every write bumps them
+async def bump_versions(*keys: str):
+    docs = await asyncio.gather(*(
+        db.collectionVersions.find_one_and_update(
+            {"_id": key},
+            {"$inc": {"version": 1}, "$setOnInsert": {"epoch": uuid.uuid4().hex[:8]}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        for key in keys
+    ))
+    for doc in docs:
+        observe_version(doc)
+
+async def current_etag(*keys: str) -> str:
+    versions = {
+        v["_id"]: v for v in await db.collectionVersions.find({"_id": {"$in": list(keys)}}).to_list(None)
+    }
+    for doc in versions.values():
+        observe_version(doc)
+    # A key nothing has written yet is version 0; only writes create it, so reads can't grow the collection.
+    # The first write gives it a fresh epoch, which keeps tags unique if the database is dropped and restarts the counters
+    return '"' + "-".join(
+        f"{versions[key]['epoch']}.{versions[key]['version']}" if key in versions else "0.0" for key in keys
+    ) + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+class ResponseCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
     
-    existing = await db.students.find_one({"rollNumber": input.rollNumber}, {"_id": 0})
+    def get(self, key, versions):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, entry_versions, value = entry
+        if expires_at < time.monotonic() or entry_versions != versions:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
     
-    if existing:
-        if isinstance(existing.get('createdAt'), str):
-            pass
-        return Student(**existing)
+    def put(self, key, versions, value):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, versions, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+
+# Loads shared by concurrent identical misses, keyed like the cache plus the versions they started under
+in_flight_loads = {}
+coalesced_requests = {}
+
+def finish_flight(flight_key, flight: asyncio.Future):
+    in_flight_loads.pop(flight_key, None)
+    # Mark a failure as retrieved even if every waiter was cancelled
+    if not flight.cancelled():
+        flight.exception()
+
+def cached_response(*dependencies: str, coalesce: bool = False):
+    # Results are keyed by loader and arguments and stamped with the dependencies' versions
+    cached_dependencies.update(dependencies)
+    
+    def decorator(load):
+        @functools.wraps(load)
+        async def wrapper(*args, **kwargs):
+            key = (load.__name__, args, tuple(sorted(kwargs.items())))
+            versions = tuple(known_versions.get(dependency) for dependency in dependencies)
+            value = response_cache.get(key, versions)
+            if value is not None:
+                response_cache.hits += 1
+                return value
+            
+            async def fill():
+                # Versions are captured before loading, so a racing write only makes the entry stale
+                value = await load(*args, **kwargs)
+                response_cache.put(key, versions, value)
+                return value
+            
+            if not coalesce:
+                response_cache.misses += 1
+                return await fill()
+            
+            # A read issued after a local write sees newer versions, so it never joins an older load
+            flight_key = (key, versions)
+            flight = in_flight_loads.get(flight_key)
+            if flight is None:
+                response_cache.misses += 1
+                flight = in_flight_loads[flight_key] = asyncio.ensure_future(fill())
+                flight.add_done_callback(functools.partial(finish_flight, flight_key))
+            else:
+                coalesced_requests[load.__name__] = coalesced_requests.get(load.__name__, 0) + 1
+            # Shielded so a disconnecting client doesn't cancel the load for everyone else
+            return await asyncio.shield(flight)
+        return wrapper
+    return decorator
+
+async def not_modified(request: Request, response: Response, *keys: str) -> Optional[Response]:
+    # The version is read before the data, so a concurrent write can only make the tag older
+    etag = await current_etag(*keys)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# Admission control bounds the DB-heavy requests a worker runs at once; waiting too long sheds with a 503
+class AdmissionController:
+    def __init__(self, max_in_flight: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+    
+    @asynccontextmanager
+    async def admit(self, policy: str):
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            record_shed(policy, "overloaded")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+        finally:
+            self.queued -= 1
+        
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+
+class TokenBucketLimiter:
+    def __init__(self, capacity: int, period_seconds: float):
+        self.capacity = capacity
+        self.refill_per_second = capacity / period_seconds
+        self.buckets = OrderedDict()
+    
+    def take(self, key: str) -> float:
+        # Returns 0 when the request may proceed, otherwise seconds until a token is available
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.refill_per_second
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > RATE_LIMIT_MAX_CLIENTS:
+            self.buckets.popitem(last=False)
+        return wait
+
+def rate_limit_setting(name: str, default: str) -> Optional[TokenBucketLimiter]:
+    # RATE_LIMIT_<NAME>="<requests>/<seconds>"; "off" disables that limit
+    value = os.environ.get(f"RATE_LIMIT_{name}", default)
+    if value == "off" or not RATE_LIMITS_ENABLED:
+        return None
+    requests, seconds = value.split("/")
+    return TokenBucketLimiter(int(requests), float(seconds))
+
+# Per-IP limits are off by default: a whole campus can sit behind one NAT address,
+# and behind a proxy the client address is only real when FORWARDED_ALLOW_IPS trusts it
+RATE_LIMIT_POLICIES = {
+    "login": {"ip": rate_limit_setting("LOGIN_IP", "off"), "student": rate_limit_setting("LOGIN_STUDENT", "10/60")},
+    "interest": {"ip": rate_limit_setting("INTEREST_IP", "off"), "student": rate_limit_setting("INTEREST_STUDENT", "30/60")},
+    "notifications": {
+        "ip": rate_limit_setting("NOTIFICATIONS_IP", "off"),
+        "student": rate_limit_setting("NOTIFICATIONS_STUDENT", "60/60")
+    },
+}
+
+admission_controller = AdmissionController(ADMISSION_MAX_IN_FLIGHT, ADMISSION_QUEUE_TIMEOUT_SECONDS)
+shed_requests = {}
+
+def record_shed(policy: str, reason: str):
+    shed_requests[(policy, reason)] = shed_requests.get((policy, reason), 0) + 1
+
+async def student_key(request: Request) -> Optional[str]:
+    if "student_id" in request.path_params:
+        return request.path_params["student_id"]
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        if isinstance(body, dict):
+            return body.get("studentId") or body.get("rollNumber")
+    return None
+
+def admission(policy: str):
+    limiters = RATE_LIMIT_POLICIES[policy]
+    
+    async def dependency(request: Request):
+        retry_after = 0.0
+        if limiters["ip"] and request.client:
+            retry_after = limiters["ip"].take(request.client.host)
+        if not retry_after and limiters["student"]:
+            key = await student_key(request)
+            if key:
+                retry_after = limiters["student"].take(key)
+        if retry_after:
+            record_shed(policy, "rate_limited")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please slow down",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        
+        async with admission_controller.admit(policy):
+            yield
     
-    student = Student(
+    return Depends(dependency)
+
+@api_router.post("/auth/student", response_model=Student, dependencies=[admission("login")])
+async def student_login(input: StudentCreate):
+    if not ROLL_NUMBER_PATTERN.match(input.rollNumber):
+        raise HTTPException(status_code=400, detail="Invalid roll number format. Use: YYYYBT(CS/AI/CSD)###")
+    
+    new_student = Student(
         id=str(uuid.uuid4()),
         name=input.name,
         branch=input.branch,
@@ -141,12 +703,31 @@ async def student_login(input: StudentCreate):
         interests=[],
         teams=[],
         isLeader=False,
-        createdAt=datetime.now(timezone.utc).isoformat()
+        unreadNotifications=0,
+        createdAt=datetime.now(timezone.utc)
     )
     
-    doc = student.model_dump()
-    await db.students.insert_one(doc)
-    return student
+    # rollNumber comes from the filter on insert, so it must not be set twice
+    doc = {
+        **new_student.model_dump(exclude={"rollNumber"}),
+        "updatedAt": new_student.createdAt,
+        "unreadCounted": True,
+        "notificationCount": 0,
+        "notificationsCounted": True
+    }
+    try:
+        student = await db.students.find_one_and_update(
+            {"rollNumber": input.rollNumber},
+            {"$setOnInsert": doc},
+            projection={"_id": 0},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # A concurrent first login for the same roll number won the upsert
+        student = await db.students.find_one({"rollNumber": input.rollNumber}, {"_id": 0})
+    
+    return Student(**student)
 
 @api_router.get("/students/{student_id}", response_model=Student)
 async def get_student(student_id: str):
@@ -159,17 +740,24 @@ async def get_student(student_id: str):
 async def update_interests(student_id: str, input: InterestUpdate):
     result = await db.students.update_one(
         {"id": student_id},
-        {"$set": {"interests": input.interests}}
+        {"$set": {"interests": input.interests, "updatedAt": datetime.now(timezone.utc)}}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Student not found")
     return {"message": "Interests updated successfully"}
 
-@api_router.get("/interests", response_model=List[Interest])
-async def get_interests():
+@cached_response("interests", coalesce=True)
+async def load_interests():
     interests = await db.interests.find({}, {"_id": 0}).to_list(1000)
     return [Interest(**i) for i in interests]
 
+@api_router.get("/interests", response_model=List[Interest])
+async def get_interests(request: Request, response: Response):
+    cached = await not_modified(request, response, "interests")
+    if cached:
+        return cached
+    return await load_interests()
+
 @api_router.post("/interests", response_model=Interest)
 async def create_interest(input: InterestCreate):
     existing = await db.interests.find_one({"name": input.name}, {"_id": 0})
@@ -179,9 +767,10 @@ async def create_interest(input: InterestCreate):
     interest = Interest(
         id=str(uuid.uuid4()),
         name=input.name,
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     await db.interests.insert_one(interest.model_dump())
+    await bump_versions("interests")
     return interest
 
 @api_router.delete("/interests/{interest_id}")
@@ -189,6 +778,7 @@ async def delete_interest(interest_id: str):
     result = await db.interests.delete_one({"id": interest_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Interest not found")
+    await bump_versions("interests")
     return {"message": "Interest deleted successfully"}
 
 @api_router.get("/students", response_model=List[Student])
@@ -217,9 +807,13 @@ async def create_team(input: TeamCreate):
         raise HTTPException(status_code=400, detail="You are already in a team. Cannot create another team.")
     
     # Check if any member is already in a team
-    for member_id in input.memberIds:
-        member = await db.students.find_one({"id": member_id}, {"_id": 0})
-        if member and member.get("teams") and len(member.get("teams", [])) > 0:
+    members = {
+        m["id"]: m for m in await db.students.find(
+            {"id": {"$in": input.memberIds}}, {"_id": 0, "id": 1, "name": 1, "teams": 1}
+        ).to_list(None)
+    }
+    for member in members.values():
+        if member.get("teams") and len(member.get("teams", [])) > 0:
             raise HTTPException(status_code=400, detail=f"Member {member.get('name', 'Unknown')} is already in a team.")
     
     team = Team(
@@ -228,47 +822,55 @@ async def create_team(input: TeamCreate):
         leaderId=input.leaderId,
         leaderName=leader["name"],
         memberIds=input.memberIds,
-        members=[],
+        members=[{"id": m, "name": members[m]["name"]} for m in input.memberIds if m in members],
         interests=input.interests,
         status="pending",
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     
-    await db.teams.insert_one(team.model_dump())
+    await db.teams.insert_one({**team.model_dump(), "updatedAt": team.createdAt})
     
     await db.students.update_one(
         {"id": input.leaderId},
         {"$set": {"isLeader": True}, "$addToSet": {"teams": team.id}}
     )
     
-    for member_id in input.memberIds:
-        await db.students.update_one(
-            {"id": member_id},
+    if input.memberIds:
+        await db.students.update_many(
+            {"id": {"$in": input.memberIds}},
             {"$addToSet": {"teams": team.id}}
         )
     
+    await bump_versions("teams")
     return team
 
-@api_router.get("/teams", response_model=List[Team])
-async def get_teams(search: Optional[str] = None):
+@cached_response("teams", coalesce=True)
+async def find_teams(search: Optional[str] = None):
     query = {}
     if search:
         query["name"] = {"$regex": search, "$options": "i"}
     
+    # Member summaries are kept on the team document by every membership change
     teams = await db.teams.find(query, {"_id": 0}).to_list(1000)
-    result = []
-    
-    for team in teams:
-        member_details = []
-        for member_id in team.get("memberIds", []):
-            member = await db.students.find_one({"id": member_id}, {"_id": 0, "name": 1, "id": 1})
-            if member:
-                member_details.append({"id": member["id"], "name": member["name"]})
-        
-        team["members"] = member_details
-        result.append(Team(**team))
+    return [Team(**team) for team in teams]
+
+@api_router.get("/teams", response_model=List[Team])
+async def get_teams(request: Request, response: Response, search: Optional[str] = None):
+    cached = await not_modified(request, response, "teams")
+    if cached:
+        return cached
+    return await find_teams(search)
+
+@api_router.get("/teams/{team_id}", response_model=Team)
+async def get_team(team_id: str, request: Request, response: Response):
+    cached = await not_modified(request, response, "teams")
+    if cached:
+        return cached
     
-    return result
+    team = await db.teams.find_one({"id": team_id}, {"_id": 0})
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    return Team(**team)
 
 @api_router.get("/teams/student/{student_id}", response_model=List[Team])
 async def get_student_teams(student_id: str):
@@ -281,19 +883,7 @@ async def get_student_teams(student_id: str):
         return []
     
     teams = await db.teams.find({"id": {"$in": team_ids}, "status": "approved"}, {"_id": 0}).to_list(1000)
-    result = []
-    
-    for team in teams:
-        member_details = []
-        for member_id in team.get("memberIds", []):
-            member = await db.students.find_one({"id": member_id}, {"_id": 0, "name": 1, "id": 1})
-            if member:
-                member_details.append({"id": member["id"], "name": member["name"]})
-        
-        team["members"] = member_details
-        result.append(Team(**team))
-    
-    return result
+    return [Team(**team) for team in teams]
 
 @api_router.post("/team-requests", response_model=JoinRequest)
 async def create_join_request(input: JoinRequestCreate):
@@ -323,7 +913,7 @@ async def create_join_request(input: JoinRequestCreate):
         studentId=input.studentId,
         studentName=student["name"],
         status="pending",
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     
     await db.teamRequests.insert_one(request.model_dump())
@@ -345,8 +935,14 @@ async def handle_request_action(input: RequestAction):
     
     if input.action == "approve":
         await db.teams.update_one(
-            {"id": request["teamId"]},
-            {"$addToSet": {"memberIds": request["studentId"]}}
+            {"id": request["teamId"], "memberIds": {"$ne": request["studentId"]}},
+            {
+                "$push": {
+                    "memberIds": request["studentId"],
+                    "members": {"id": request["studentId"], "name": request["studentName"]}
+                },
+                "$set": {"updatedAt": datetime.now(timezone.utc)}
+            }
         )
         await db.students.update_one(
             {"id": request["studentId"]},
@@ -356,6 +952,7 @@ async def handle_request_action(input: RequestAction):
             {"id": input.requestId},
             {"$set": {"status": "approved"}}
         )
+        await bump_versions("teams")
         return {"message": "Request approved successfully"}
     elif input.action == "reject":
         await db.teamRequests.update_one(
@@ -366,6 +963,50 @@ async def handle_request_action(input: RequestAction):
     else:
         raise HTTPException(status_code=400, detail="Invalid action")
 
+@api_router.post("/team-requests/batch-action")
+async def handle_request_batch_action(input: RequestBatchAction):
+    ids = [a.requestId for a in input.actions]
+    requests = {
+        r["id"]: r for r in await db.teamRequests.find({"id": {"$in": ids}}, {"_id": 0}).to_list(None)
+    }
+    actions, results = split_batch(input.actions, "requestId", requests, "Request not found")
+    
+    approved = [requests[a.requestId] for a in actions if a.action == "approve"]
+    rejected = [a.requestId for a in actions if a.action == "reject"]
+    
+    if approved:
+        now = datetime.now(timezone.utc)
+        # One update per member so a student already on the team is skipped without duplicating the summary
+        await db.teams.bulk_write([
+            UpdateOne(
+                {"id": request["teamId"], "memberIds": {"$ne": request["studentId"]}},
+                {
+                    "$push": {
+                        "memberIds": request["studentId"],
+                        "members": {"id": request["studentId"], "name": request["studentName"]}
+                    },
+                    "$set": {"updatedAt": now}
+                }
+            )
+            for request in approved
+        ], ordered=False)
+        await db.students.bulk_write([
+            UpdateOne({"id": request["studentId"]}, {"$addToSet": {"teams": request["teamId"]}})
+            for request in approved
+        ], ordered=False)
+        await db.teamRequests.update_many(
+            {"id": {"$in": [request["id"] for request in approved]}},
+            {"$set": {"status": "approved"}}
+        )
+        await bump_versions("teams")
+    if rejected:
+        await db.teamRequests.update_many(
+            {"id": {"$in": rejected}},
+            {"$set": {"status": "rejected"}}
+        )
+    
+    return batch_response(results)
+
 @api_router.post("/admin/login")
 async def admin_login(input: AdminLogin):
     if input.password == "AURORA":
@@ -377,10 +1018,11 @@ async def admin_login(input: AdminLogin):
 async def approve_team(team_id: str):
     result = await db.teams.update_one(
         {"id": team_id},
-        {"$set": {"status": "approved"}}
+        {"$set": {"status": "approved", "updatedAt": datetime.now(timezone.utc)}}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Team not found")
+    await bump_versions("teams")
     return {"message": "Team approved successfully"}
 
 @api_router.post("/admin/teams/{team_id}/reject")
@@ -391,7 +1033,7 @@ async def reject_team(team_id: str):
     
     await db.teams.update_one(
         {"id": team_id},
-        {"$set": {"status": "rejected"}}
+        {"$set": {"status": "rejected", "updatedAt": datetime.now(timezone.utc)}}
     )
     
     await db.students.update_many(
@@ -407,8 +1049,47 @@ async def reject_team(team_id: str):
                 {"$set": {"isLeader": False}}
             )
     
+    await bump_versions("teams")
     return {"message": "Team rejected successfully"}
 
+@api_router.post("/admin/teams/batch-action")
+async def admin_team_batch_action(input: TeamBatchAction):
+    ids = [a.teamId for a in input.actions]
+    teams = {
+        t["id"]: t for t in await db.teams.find(
+            {"id": {"$in": ids}}, {"_id": 0, "id": 1, "leaderId": 1}
+        ).to_list(None)
+    }
+    actions, results = split_batch(input.actions, "teamId", teams, "Team not found")
+    if not actions:
+        return batch_response(results)
+    
+    now = datetime.now(timezone.utc)
+    await db.teams.bulk_write([
+        UpdateOne({"id": a.teamId}, {"$set": {"status": BATCH_ACTIONS[a.action], "updatedAt": now}})
+        for a in actions
+    ], ordered=False)
+    await bump_versions("teams")
+    
+    rejected = [a.teamId for a in actions if a.action == "reject"]
+    if rejected:
+        await db.students.update_many(
+            {"teams": {"$in": rejected}},
+            {"$pull": {"teams": {"$in": rejected}}}
+        )
+        leader_ids = list({teams[team_id]["leaderId"] for team_id in rejected if teams[team_id].get("leaderId")})
+        still_leading = await db.teams.distinct(
+            "leaderId", {"leaderId": {"$in": leader_ids}, "status": "approved"}
+        )
+        former_leaders = [leader_id for leader_id in leader_ids if leader_id not in still_leading]
+        if former_leaders:
+            await db.students.update_many(
+                {"id": {"$in": former_leaders}},
+                {"$set": {"isLeader": False}}
+            )
+    
+    return batch_response(results)
+
 @api_router.get("/admin/students", response_model=List[Student])
 async def admin_get_students():
     students = await db.students.find({}, {"_id": 0}).to_list(1000)
@@ -416,47 +1097,162 @@ async def admin_get_students():
 
 @api_router.get("/admin/teams", response_model=List[Team])
 async def admin_get_teams():
-    return await get_teams()
+    return await find_teams()
 
 @api_router.get("/admin/requests", response_model=List[JoinRequest])
 async def admin_get_all_requests():
     requests = await db.teamRequests.find({}, {"_id": 0}).to_list(1000)
     return [JoinRequest(**r) for r in requests]
 
-@api_router.delete("/admin/students/{student_id}")
-async def admin_delete_student(student_id: str):
-    await db.students.delete_one({"id": student_id})
-    await db.teams.update_many(
-        {"memberIds": student_id},
-        {"$pull": {"memberIds": student_id}}
+transactions_supported = True
+
+async def run_in_transaction(writes):
+    global transactions_supported
+    if transactions_supported:
+        try:
+            async with await client.start_session() as session:
+                await session.with_transaction(writes)
+            return
+        except OperationFailure as e:
+            # Standalone mongod: code 20 "Transaction numbers are only allowed on a replica set member"
+            if e.code != 20:
+                raise
+            transactions_supported = False
+            logger.warning("MongoDB deployment does not support transactions; cascades will not be atomic")
+    
+    await writes(None)
+
+async def delete_students_cascade(student_ids: List[str]) -> int:
+    deleted = 0
+    
+    async def writes(session):
+        nonlocal deleted
+        result = await db.students.delete_many({"id": {"$in": student_ids}}, session=session)
+        deleted = result.deleted_count
+        await db.teams.update_many(
+            {"memberIds": {"$in": student_ids}},
+            {
+                "$pull": {"memberIds": {"$in": student_ids}, "members": {"id": {"$in": student_ids}}},
+                "$set": {"updatedAt": datetime.now(timezone.utc)}
+            },
+            session=session
+        )
+        await db.teams.update_many(
+            {"leaderId": {"$in": student_ids}},
+            {"$set": {"leaderId": ""}},
+            session=session
+        )
+        await db.teamRequests.delete_many({"studentId": {"$in": student_ids}}, session=session)
+    
+    await run_in_transaction(writes)
+    
+    # Nothing references these documents, so they are removed after commit and in parallel
+    await asyncio.gather(
+        db.messages.delete_many({"studentId": {"$in": student_ids}}),
+        db.messageBuckets.update_many(
+            {"messages.studentId": {"$in": student_ids}},
+            {"$pull": {"messages": {"studentId": {"$in": student_ids}}}}
+        ),
+        db.notifications.delete_many({"studentId": {"$in": student_ids}}),
+        db.notificationsArchive.delete_many({"studentId": {"$in": student_ids}}),
+        db.leaveApplications.delete_many({"studentId": {"$in": student_ids}}),
+        db.events.update_many(
+            {"$or": [{"interestedStudents": {"$in": student_ids}}, {"notInterestedStudents": {"$in": student_ids}}]},
+            {
+                "$pull": {"interestedStudents": {"$in": student_ids}, "notInterestedStudents": {"$in": student_ids}},
+                "$set": {"updatedAt": datetime.now(timezone.utc)}
+            }
+        ),
+        db.photos.update_many({"likes": {"$in": student_ids}}, {"$pull": {"likes": {"$in": student_ids}}})
     )
-    await db.teams.update_many(
-        {"leaderId": student_id},
-        {"$set": {"leaderId": ""}}
+    await bump_versions("teams", "messages", "events", "photos")
+    await invalidate_analytics("students")
+    return deleted
+
+async def delete_teams_cascade(team_ids: List[str]) -> int:
+    deleted = 0
+    
+    async def writes(session):
+        nonlocal deleted
+        teams = await db.teams.find(
+            {"id": {"$in": team_ids}}, {"_id": 0, "leaderId": 1}, session=session
+        ).to_list(None)
+        result = await db.teams.delete_many({"id": {"$in": team_ids}}, session=session)
+        deleted = result.deleted_count
+        await db.students.update_many(
+            {"teams": {"$in": team_ids}},
+            {"$pull": {"teams": {"$in": team_ids}}},
+            session=session
+        )
+        await db.teamRequests.delete_many({"teamId": {"$in": team_ids}}, session=session)
+        
+        leader_ids = list({t["leaderId"] for t in teams if t.get("leaderId")})
+        still_leading = await db.teams.distinct("leaderId", {"leaderId": {"$in": leader_ids}}, session=session)
+        former_leaders = [leader_id for leader_id in leader_ids if leader_id not in still_leading]
+        if former_leaders:
+            await db.students.update_many(
+                {"id": {"$in": former_leaders}},
+                {"$set": {"isLeader": False}},
+                session=session
+            )
+    
+    await run_in_transaction(writes)
+    await asyncio.gather(
+        db.messages.delete_many({"teamId": {"$in": team_ids}}),
+        db.messageBuckets.delete_many({"teamId": {"$in": team_ids}}),
+        # Their message reads now 404, so the per-team versions would only linger
+        db.collectionVersions.delete_many({"_id": {"$in": [f"messages:{team_id}" for team_id in team_ids]}})
     )
-    await db.teamRequests.delete_many({"studentId": student_id})
+    await bump_versions("teams")
+    await invalidate_analytics("teams")
+    return deleted
+
+@api_router.delete("/admin/students/{student_id}")
+async def admin_delete_student(student_id: str):
+    await delete_students_cascade([student_id])
     return {"message": "Student deleted successfully"}
 
+@api_router.post("/admin/students/batch-delete", status_code=status.HTTP_202_ACCEPTED)
+async def admin_batch_delete_students(input: BatchDelete):
+    job_id = await enqueue_job("delete_students", {"ids": input.ids})
+    return {"message": f"Deletion of {len(input.ids)} students queued", "jobId": job_id}
+
 @api_router.delete("/admin/teams/{team_id}")
 async def admin_delete_team(team_id: str):
-    await db.teams.delete_one({"id": team_id})
-    await db.students.update_many(
-        {"teams": team_id},
-        {"$pull": {"teams": team_id}}
-    )
-    await db.teamRequests.delete_many({"teamId": team_id})
+    await delete_teams_cascade([team_id])
     return {"message": "Team deleted successfully"}
 
+@api_router.post("/admin/teams/batch-delete", status_code=status.HTTP_202_ACCEPTED)
+async def admin_batch_delete_teams(input: BatchDelete):
+    job_id = await enqueue_job("delete_teams", {"ids": input.ids})
+    return {"message": f"Deletion of {len(input.ids)} teams queued", "jobId": job_id}
+
+@api_router.post("/admin/messages/migrate-buckets", status_code=status.HTTP_202_ACCEPTED)
+async def admin_migrate_message_buckets():
+    if MESSAGE_STORAGE != "buckets":
+        raise HTTPException(status_code=400, detail="Set MESSAGE_STORAGE=buckets before migrating messages")
+    if not await dates_migrated():
+        # Buckets are filled in createdAt order, which mixed strings and dates would scramble
+        raise HTTPException(status_code=400, detail="Run the date migration before migrating messages")
+    job_id = await enqueue_job("migrate_message_buckets", {})
+    return {"message": "Message migration queued", "jobId": job_id}
+
+@api_router.post("/admin/migrations/dates", status_code=status.HTTP_202_ACCEPTED)
+async def admin_migrate_dates():
+    job_id = await enqueue_job("migrate_dates", {})
+    return {"message": "Date migration queued", "jobId": job_id}
+
 @api_router.post("/admin/teams/{team_id}/remove-member")
 async def admin_remove_member(team_id: str, member_id: str):
     await db.teams.update_one(
         {"id": team_id},
-        {"$pull": {"memberIds": member_id}}
+        {"$pull": {"memberIds": member_id, "members": {"id": member_id}}, "$set": {"updatedAt": datetime.now(timezone.utc)}}
     )
     await db.students.update_one(
         {"id": member_id},
         {"$pull": {"teams": team_id}}
     )
+    await bump_versions("teams")
     return {"message": "Member removed successfully"}
 
 @api_router.get("/admin/stats")
@@ -473,6 +1269,7 @@ async def admin_get_stats():
     csd_students = await db.students.count_documents({"branch": "CSD"})
     
     total_events = await db.events.count_documents({})
+    pending_leaves = await db.leaveApplications.count_documents({"status": "pending"})
     
     return {
         "totalStudents": total_students,
@@ -484,7 +1281,8 @@ async def admin_get_stats():
         "cseStudents": cse_students,
         "aiStudents": ai_students,
         "csdStudents": csd_students,
-        "totalEvents": total_events
+        "totalEvents": total_events,
+        "pendingLeaves": pending_leaves
     }
 
 class InterestRequirement(BaseModel):
@@ -504,7 +1302,7 @@ class Event(BaseModel):
     interestRequirements: List[dict]
     interestedStudents: List[str] = Field(default_factory=list)
     notInterestedStudents: List[str] = Field(default_factory=list)
-    createdAt: str
+    createdAt: datetime
 
 class CompetitionCreate(BaseModel):
     name: str
@@ -521,7 +1319,7 @@ class Competition(BaseModel):
     skillsRequired: str
     rules: str
     eventDate: str
-    createdAt: str
+    createdAt: datetime
 
 class Notification(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -532,7 +1330,11 @@ class Notification(BaseModel):
     type: str
     relatedId: str
     isRead: bool
-    createdAt: str
+    createdAt: datetime
+
+class NotificationBatchRead(BaseModel):
+    studentId: str
+    notificationIds: List[str]
 
 class PhotoCreate(BaseModel):
     eventName: str
@@ -545,15 +1347,61 @@ class Photo(BaseModel):
     eventName: str
     description: str
     photoUrl: str
+    thumbnailUrl: Optional[str] = None
+    mediumUrl: Optional[str] = None
     likes: List[str] = Field(default_factory=list)
     uploadedBy: str
-    createdAt: str
+    createdAt: datetime
 
 class StudentInterest(BaseModel):
     eventId: str
     studentId: str
     interested: bool
 
+UNREAD_COUNTER_BATCH_SIZE = 10000
+
+async def insert_notifications(notifications: List[Notification]):
+    if not notifications:
+        return
+    # The counters move after the insert, so each notification records whether its increment has landed
+    duplicates = set()
+    try:
+        await db.notifications.insert_many(
+            [{**n.model_dump(), "counted": False} for n in notifications], ordered=False
+        )
+    except BulkWriteError as e:
+        # A retried fan-out job re-inserts notifications it already delivered
+        if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+            raise
+        duplicates = {error["index"] for error in e.details["writeErrors"]}
+    
+    # Delivered notifications whose increment a crashed attempt never made are counted now
+    uncounted = set()
+    if duplicates:
+        uncounted = set(await db.notifications.distinct(
+            "id", {"id": {"$in": [notifications[index].id for index in duplicates]}, "counted": False}
+        ))
+    pending = [n for index, n in enumerate(notifications) if index not in duplicates or n.id in uncounted]
+    
+    # Keep each student's unreadNotifications and notificationCount counters in step with the inserts
+    per_student = {}
+    for n in pending:
+        per_student[n.studentId] = per_student.get(n.studentId, 0) + 1
+    by_increment = {}
+    for student_id, increment in per_student.items():
+        by_increment.setdefault(increment, []).append(student_id)
+    for increment, student_ids in by_increment.items():
+        for offset in range(0, len(student_ids), UNREAD_COUNTER_BATCH_SIZE):
+            await db.students.update_many(
+                {"id": {"$in": student_ids[offset:offset + UNREAD_COUNTER_BATCH_SIZE]}},
+                {"$inc": {"unreadNotifications": increment, "notificationCount": increment}}
+            )
+    ids = [n.id for n in pending]
+    for offset in range(0, len(ids), UNREAD_COUNTER_BATCH_SIZE):
+        await db.notifications.update_many(
+            {"id": {"$in": ids[offset:offset + UNREAD_COUNTER_BATCH_SIZE]}}, {"$set": {"counted": True}}
+        )
+
 @api_router.post("/events", response_model=Event)
 async def create_event(input: EventCreate):
     event = Event(
@@ -563,39 +1411,49 @@ async def create_event(input: EventCreate):
         interestRequirements=[req.model_dump() for req in input.interestRequirements],
         interestedStudents=[],
         notInterestedStudents=[],
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
-    await db.events.insert_one(event.model_dump())
+    await db.events.insert_one({**event.model_dump(), "updatedAt": event.createdAt})
+    await bump_versions("events")
     
-    all_students = await db.students.find({}, {"_id": 0}).to_list(1000)
-    for student in all_students:
-        notification = Notification(
-            id=str(uuid.uuid4()),
-            studentId=student["id"],
-            title="New Event Created!",
-            message=f"Check out the new event: {input.name}",
-            type="event",
-            relatedId=event.id,
-            isRead=False,
-            createdAt=datetime.now(timezone.utc).isoformat()
-        )
-        await db.notifications.insert_one(notification.model_dump())
+    await enqueue_job("notify_all_students", {
+        "title": "New Event Created!",
+        "message": f"Check out the new event: {input.name}",
+        "type": "event",
+        "relatedId": event.id
+    })
     
     return event
 
-@api_router.get("/events", response_model=List[Event])
-async def get_events():
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
+@cached_response("events", coalesce=True)
+async def load_events(created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    events = await (await find_by_date(
+        "events", created_range(created_after, created_before), {"_id": 0}, "createdAt", 1, limit=1000
+    )).to_list(1000)
     return [Event(**e) for e in events]
 
+@api_router.get("/events", response_model=List[Event])
+async def get_events(
+    request: Request,
+    response: Response,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    cached = await not_modified(request, response, "events")
+    if cached:
+        return cached
+    return await load_events(created_after, created_before)
+
 @api_router.delete("/events/{event_id}")
 async def delete_event(event_id: str):
     result = await db.events.delete_one({"id": event_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
+    await bump_versions("events")
+    await invalidate_analytics("events")
     return {"message": "Event deleted successfully"}
 
-@api_router.post("/events/interest")
+@api_router.post("/events/interest", dependencies=[admission("interest")])
 async def mark_interest(input: StudentInterest):
     event = await db.events.find_one({"id": input.eventId}, {"_id": 0})
     if not event:
@@ -606,18 +1464,22 @@ async def mark_interest(input: StudentInterest):
             {"id": input.eventId},
             {
                 "$addToSet": {"interestedStudents": input.studentId},
-                "$pull": {"notInterestedStudents": input.studentId}
+                "$pull": {"notInterestedStudents": input.studentId},
+                "$set": {"updatedAt": datetime.now(timezone.utc)}
             }
         )
+        await bump_versions("events")
         return {"message": "Marked as interested"}
     else:
         await db.events.update_one(
             {"id": input.eventId},
             {
                 "$addToSet": {"notInterestedStudents": input.studentId},
-                "$pull": {"interestedStudents": input.studentId}
+                "$pull": {"interestedStudents": input.studentId},
+                "$set": {"updatedAt": datetime.now(timezone.utc)}
             }
         )
+        await bump_versions("events")
         return {"message": "Marked as not interested"}
 
 @api_router.get("/events/{event_id}/interested")
@@ -655,7 +1517,48 @@ class Message(BaseModel):
     studentId: str
     studentName: str
     message: str
-    createdAt: str
+    createdAt: datetime
+
+MESSAGE_LIMIT = 1000
+
+async def append_to_bucket(message: Message):
+    entry = message.model_dump(exclude={"teamId"})
+    # count only ever grows, so a full bucket stays closed even after deletions
+    await db.messageBuckets.update_one(
+        {"teamId": message.teamId, "count": {"$lt": MESSAGE_BUCKET_SIZE}},
+        {
+            "$push": {"messages": entry},
+            "$inc": {"count": 1},
+            "$max": {"lastAt": message.createdAt},
+            "$setOnInsert": {"id": str(uuid.uuid4()), "firstAt": message.createdAt}
+        },
+        upsert=True
+    )
+
+async def read_buckets(
+    team_id: str,
+    limit: int,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+) -> List[dict]:
+    query = {"teamId": team_id}
+    if created_after:
+        created_after = as_datetime(created_after)
+        query["lastAt"] = {"$gte": created_after}
+    if created_before:
+        created_before = as_datetime(created_before)
+        query["firstAt"] = {"$lt": created_before}
+    
+    messages = []
+    async for bucket in await find_by_date("messageBuckets", query, {"_id": 0}, "firstAt", 1):
+        for m in bucket["messages"]:
+            created_at = as_datetime(m["createdAt"])
+            if created_after and created_at < created_after or created_before and created_at >= created_before:
+                continue
+            messages.append({**m, "teamId": team_id})
+        if len(messages) >= limit:
+            break
+    return messages
 
 @api_router.post("/teams/{team_id}/messages", response_model=Message)
 async def send_message(team_id: str, input: MessageCreate):
@@ -669,18 +1572,42 @@ async def send_message(team_id: str, input: MessageCreate):
         studentId=input.studentId,
         studentName=input.studentName,
         message=input.message,
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     
-    await db.messages.insert_one(message.model_dump())
+    if MESSAGE_STORAGE == "buckets":
+        await append_to_bucket(message)
+    else:
+        await db.messages.insert_one(message.model_dump())
+    await bump_versions(f"messages:{team_id}")
     return message
 
 @api_router.get("/teams/{team_id}/messages", response_model=List[Message])
-async def get_team_messages(team_id: str):
-    messages = await db.messages.find(
-        {"teamId": team_id},
-        {"_id": 0}
-    ).sort("createdAt", 1).to_list(1000)
+async def get_team_messages(
+    team_id: str,
+    request: Request,
+    response: Response,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    if not await db.teams.find_one({"id": team_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Team not found")
+    
+    # "messages" moves when a cascade removes messages across teams
+    cached = await not_modified(request, response, "messages", f"messages:{team_id}")
+    if cached:
+        return cached
+    
+    messages = await (await find_by_date(
+        "messages", {"teamId": team_id, **created_range(created_after, created_before)}, {"_id": 0},
+        "createdAt", 1, limit=MESSAGE_LIMIT
+    )).to_list(MESSAGE_LIMIT)
+    
+    if MESSAGE_STORAGE == "buckets":
+        # Until the migration finishes a team can have messages in both layouts
+        merged = {m["id"]: m for m in await read_buckets(team_id, MESSAGE_LIMIT, created_after, created_before)}
+        merged.update((m["id"], m) for m in messages)
+        messages = sorted(merged.values(), key=lambda m: as_datetime(m["createdAt"]))[:MESSAGE_LIMIT]
     
     return [Message(**m) for m in messages]
 
@@ -688,7 +1615,13 @@ async def get_team_messages(team_id: str):
 async def delete_message(team_id: str, message_id: str):
     result = await db.messages.delete_one({"id": message_id, "teamId": team_id})
     if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Message not found")
+        result = await db.messageBuckets.update_one(
+            {"teamId": team_id, "messages.id": message_id},
+            {"$pull": {"messages": {"id": message_id}}}
+        )
+        if result.modified_count == 0:
+            raise HTTPException(status_code=404, detail="Message not found")
+    await bump_versions(f"messages:{team_id}")
     return {"message": "Message deleted successfully"}
 
 @api_router.post("/competitions", response_model=Competition)
@@ -700,29 +1633,26 @@ async def create_competition(input: CompetitionCreate):
         skillsRequired=input.skillsRequired,
         rules=input.rules,
         eventDate=input.eventDate,
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     await db.competitions.insert_one(competition.model_dump())
+    await bump_versions("competitions")
     
-    all_students = await db.students.find({}, {"_id": 0}).to_list(1000)
-    for student in all_students:
-        notification = Notification(
-            id=str(uuid.uuid4()),
-            studentId=student["id"],
-            title="New Competition Announced!",
-            message=f"{input.name} - Date: {input.eventDate}",
-            type="competition",
-            relatedId=competition.id,
-            isRead=False,
-            createdAt=datetime.now(timezone.utc).isoformat()
-        )
-        await db.notifications.insert_one(notification.model_dump())
+    await enqueue_job("notify_all_students", {
+        "title": "New Competition Announced!",
+        "message": f"{input.name} - Date: {input.eventDate}",
+        "type": "competition",
+        "relatedId": competition.id
+    })
     
     return competition
 
 @api_router.get("/competitions", response_model=List[Competition])
-async def get_competitions():
-    competitions = await db.competitions.find({}, {"_id": 0}).to_list(1000)
+@cached_response("competitions")
+async def get_competitions(created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    competitions = await (await find_by_date(
+        "competitions", created_range(created_after, created_before), {"_id": 0}, "createdAt", 1, limit=1000
+    )).to_list(1000)
     return [Competition(**c) for c in competitions]
 
 @api_router.delete("/competitions/{competition_id}")
@@ -730,26 +1660,69 @@ async def delete_competition(competition_id: str):
     result = await db.competitions.delete_one({"id": competition_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Competition not found")
+    await bump_versions("competitions")
     return {"message": "Competition deleted successfully"}
 
-@api_router.get("/notifications/{student_id}", response_model=List[Notification])
-async def get_student_notifications(student_id: str):
-    notifications = await db.notifications.find(
-        {"studentId": student_id},
-        {"_id": 0}
-    ).sort("createdAt", -1).to_list(100)
+@api_router.get("/notifications/{student_id}", response_model=List[Notification], dependencies=[admission("notifications")])
+async def get_student_notifications(
+    student_id: str,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    notifications = await (await find_by_date(
+        "notifications", {"studentId": student_id, **created_range(created_after, created_before)}, {"_id": 0},
+        "createdAt", -1, limit=100
+    )).to_list(100)
     return [Notification(**n) for n in notifications]
 
-@api_router.post("/notifications/{notification_id}/read")
+@api_router.post("/notifications/{notification_id}/read", dependencies=[admission("notifications")])
 async def mark_notification_read(notification_id: str):
-    await db.notifications.update_one(
-        {"id": notification_id},
-        {"$set": {"isRead": True}}
+    # Only the request that flips isRead may decrement the counter
+    notification = await db.notifications.find_one_and_update(
+        {"id": notification_id, "isRead": False},
+        {"$set": {"isRead": True, "readAt": datetime.now(timezone.utc)}},
+        projection={"_id": 0, "studentId": 1}
     )
+    if notification:
+        await db.students.update_one(
+            {"id": notification["studentId"]},
+            {"$inc": {"unreadNotifications": -1}}
+        )
     return {"message": "Notification marked as read"}
 
-@api_router.get("/notifications/{student_id}/unread-count")
+@api_router.post("/notifications/read", dependencies=[admission("notifications")])
+async def mark_notifications_read(input: NotificationBatchRead):
+    result = await db.notifications.update_many(
+        {"id": {"$in": input.notificationIds}, "studentId": input.studentId, "isRead": False},
+        {"$set": {"isRead": True, "readAt": datetime.now(timezone.utc)}}
+    )
+    if result.modified_count:
+        await db.students.update_one(
+            {"id": input.studentId},
+            {"$inc": {"unreadNotifications": -result.modified_count}}
+        )
+    return {"message": "Notifications marked as read", "updated": result.modified_count}
+
+@api_router.post("/notifications/{student_id}/mark-all-read", dependencies=[admission("notifications")])
+async def mark_all_notifications_read(student_id: str):
+    result = await db.notifications.update_many(
+        {"studentId": student_id, "isRead": False},
+        {"$set": {"isRead": True, "readAt": datetime.now(timezone.utc)}}
+    )
+    if result.modified_count:
+        await db.students.update_one(
+            {"id": student_id},
+            {"$inc": {"unreadNotifications": -result.modified_count}}
+        )
+    return {"message": "All notifications marked as read", "updated": result.modified_count}
+
+@api_router.get("/notifications/{student_id}/unread-count", dependencies=[admission("notifications")])
 async def get_unread_count(student_id: str):
+    student = await db.students.find_one({"id": student_id}, {"_id": 0, "unreadNotifications": 1, "unreadCounted": 1})
+    if student and student.get("unreadCounted"):
+        return {"count": max(student["unreadNotifications"], 0)}
+    
+    # Counter not settled by backfill_unread_counters yet for this student
     count = await db.notifications.count_documents({"studentId": student_id, "isRead": False})
     return {"count": count}
 
@@ -762,21 +1735,42 @@ async def create_photo(input: PhotoCreate):
         photoUrl=input.photoUrl,
         likes=[],
         uploadedBy="admin",
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     await db.photos.insert_one(photo.model_dump())
+    await bump_versions("photos")
+    
+    # Only stored uploads get renditions; external URLs are never fetched by the server
+    upload_id = input.photoUrl.removeprefix("/api/uploads/")
+    if upload_id != input.photoUrl:
+        await enqueue_job("render_photo", {"photoId": photo.id, "uploadId": upload_id})
     return photo
 
-@api_router.get("/photos", response_model=List[Photo])
-async def get_photos():
-    photos = await db.photos.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
+@cached_response("photos", coalesce=True)
+async def load_photos(created_after: Optional[datetime] = None, created_before: Optional[datetime] = None):
+    photos = await (await find_by_date(
+        "photos", created_range(created_after, created_before), {"_id": 0}, "createdAt", -1, limit=1000
+    )).to_list(1000)
     return [Photo(**p) for p in photos]
 
+@api_router.get("/photos", response_model=List[Photo])
+async def get_photos(
+    request: Request,
+    response: Response,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None
+):
+    cached = await not_modified(request, response, "photos")
+    if cached:
+        return cached
+    return await load_photos(created_after, created_before)
+
 @api_router.delete("/photos/{photo_id}")
 async def delete_photo(photo_id: str):
     result = await db.photos.delete_one({"id": photo_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Photo not found")
+    await bump_versions("photos")
     return {"message": "Photo deleted successfully"}
 
 @api_router.post("/photos/{photo_id}/like")
@@ -791,14 +1785,204 @@ async def like_photo(photo_id: str, student_id: str):
             {"id": photo_id},
             {"$pull": {"likes": student_id}}
         )
+        await bump_versions("photos")
         return {"message": "Photo unliked", "liked": False}
     else:
         await db.photos.update_one(
             {"id": photo_id},
             {"$addToSet": {"likes": student_id}}
         )
+        await bump_versions("photos")
         return {"message": "Photo liked", "liked": True}
 
+# File Uploads
+UPLOAD_CHUNK_SIZE = 255 * 1024
+UPLOAD_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "application/pdf"}
+
+class Upload(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    url: str
+    filename: str
+    contentType: str
+    length: int
+    createdAt: datetime
+
+# Room for the multipart boundaries and part headers around the file itself
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+class UploadLimitMiddleware:
+    # The form parser spools the whole body before upload_file runs, so the cap is enforced as the body arrives
+    def __init__(self, app):
+        self.app = app
+        self.max_bytes = UPLOAD_MAX_BYTES + UPLOAD_FORM_OVERHEAD_BYTES
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/api/uploads":
+            await self.app(scope, receive, send)
+            return
+        
+        detail = f"Files are limited to {UPLOAD_MAX_BYTES} bytes"
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > self.max_bytes:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def receive_wrapper():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside the form parser, which passes HTTPExceptions through to the handlers
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+        
+        await self.app(scope, receive_wrapper, send)
+
+def file_bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name="files", chunk_size_bytes=UPLOAD_CHUNK_SIZE)
+
+@api_router.post("/uploads", response_model=Upload)
+async def upload_file(file: UploadFile = File(...)):
+    if file.content_type not in UPLOAD_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail="Only JPEG, PNG, WebP, GIF and PDF files can be uploaded")
+    
+    # The form parser spools the body to a temporary file; hash it chunk by chunk before storing anything
+    digest = hashlib.sha256()
+    length = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        length += len(chunk)
+        if length > UPLOAD_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Files are limited to {UPLOAD_MAX_BYTES} bytes")
+        digest.update(chunk)
+    
+    # Uploads are addressed by content, so a duplicate returns the stored copy
+    upload_id = digest.hexdigest()
+    existing = await db.uploads.find_one({"id": upload_id}, {"_id": 0})
+    if existing:
+        return Upload(**existing)
+    
+    await file.seek(0)
+    stream = file_bucket().open_upload_stream(upload_id, metadata={"contentType": file.content_type})
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await stream.write(chunk)
+    except BaseException:
+        await stream.abort()
+        raise
+    await stream.close()
+    return await register_upload(upload_id, stream._id, file.filename or upload_id, file.content_type, length)
+
+async def register_upload(upload_id: str, file_id, filename: str, content_type: str, length: int) -> Upload:
+    upload = Upload(
+        id=upload_id,
+        url=f"/api/uploads/{upload_id}",
+        filename=filename,
+        contentType=content_type,
+        length=length,
+        createdAt=datetime.now(timezone.utc)
+    )
+    try:
+        await db.uploads.insert_one({**upload.model_dump(), "fileId": file_id})
+    except DuplicateKeyError:
+        # A concurrent upload of the same content got there first
+        await file_bucket().delete(file_id)
+        return Upload(**await db.uploads.find_one({"id": upload_id}, {"_id": 0}))
+    return upload
+
+async def store_bytes(data: bytes, filename: str, content_type: str) -> Upload:
+    upload_id = hashlib.sha256(data).hexdigest()
+    existing = await db.uploads.find_one({"id": upload_id}, {"_id": 0})
+    if existing:
+        return Upload(**existing)
+    file_id = await file_bucket().upload_from_stream(upload_id, data, metadata={"contentType": content_type})
+    return await register_upload(upload_id, file_id, filename, content_type, len(data))
+
+def parse_byte_range(header: str, length: int):
+    # Only single ranges are served; anything else falls back to the whole file
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else length - 1
+        else:
+            start = max(0, length - int(last))
+            end = length - 1
+    except ValueError:
+        return None
+    if start >= length:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{length}"}
+        )
+    if end < start:
+        return None
+    return start, min(end, length - 1)
+
+def modified_since(if_modified_since: Optional[str], last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+    return last_modified.replace(microsecond=0) > as_datetime(since)
+
+@api_router.get("/uploads/{upload_id}")
+async def download_file(upload_id: str, request: Request):
+    upload = await db.uploads.find_one({"id": upload_id}, {"_id": 0})
+    if not upload:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    etag = f'"{upload_id}"'
+    last_modified = as_datetime(upload["createdAt"])
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(upload['filename'])}"
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        not if_none_match and not modified_since(request.headers.get("if-modified-since"), last_modified)
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    length = upload["length"]
+    byte_range = None
+    if request.headers.get("range") and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_byte_range(request.headers["range"], length)
+    start, end = byte_range or (0, length - 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    grid_out = await file_bucket().open_download_stream(upload["fileId"])
+    grid_out.seek(start)
+    
+    async def body():
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    
+    return StreamingResponse(
+        body(),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=upload["contentType"],
+        headers=headers
+    )
+
 # Leave Application Endpoints
 @api_router.post("/leave-applications", response_model=LeaveApplication)
 async def create_leave_application(input: LeaveApplicationCreate):
@@ -817,23 +2001,56 @@ async def create_leave_application(input: LeaveApplicationCreate):
         toDate=input.toDate,
         documentUrl=input.documentUrl,
         status="pending",
-        createdAt=datetime.now(timezone.utc).isoformat()
+        createdAt=datetime.now(timezone.utc)
     )
     
-    await db.leaveApplications.insert_one(leave.model_dump())
+    await db.leaveApplications.insert_one({
+        **leave.model_dump(),
+        "fromDate": as_datetime(leave.fromDate),
+        "toDate": as_datetime(leave.toDate)
+    })
     return leave
 
 @api_router.get("/leave-applications/student/{student_id}", response_model=List[LeaveApplication])
 async def get_student_leaves(student_id: str):
-    leaves = await db.leaveApplications.find(
-        {"studentId": student_id},
-        {"_id": 0}
-    ).sort("createdAt", -1).to_list(100)
+    leaves = await (await find_by_date(
+        "leaveApplications", {"studentId": student_id}, {"_id": 0}, "createdAt", -1, limit=100
+    )).to_list(100)
     return [LeaveApplication(**leave) for leave in leaves]
 
+def leave_overlap(on_leave_from: Optional[date], on_leave_to: Optional[date]) -> dict:
+    # A leave overlaps [on_leave_from, on_leave_to] when it starts before the end and ends after the start
+    query = {}
+    if on_leave_to:
+        query["fromDate"] = {"$lte": as_datetime(on_leave_to)}
+    if on_leave_from:
+        query["toDate"] = {"$gte": as_datetime(on_leave_from)}
+    return query
+
 @api_router.get("/admin/leave-applications", response_model=List[LeaveApplication])
-async def get_all_leaves():
-    leaves = await db.leaveApplications.find({}, {"_id": 0}).sort("createdAt", -1).to_list(1000)
+async def get_all_leaves(
+    # Named apart from the fastapi status module this file uses for response codes
+    status_filter: Optional[str] = Query(None, alias="status"),
+    branch: Optional[str] = None,
+    student_id: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    on_leave_from: Optional[date] = None,
+    on_leave_to: Optional[date] = None
+):
+    query = created_range(created_after, created_before)
+    if status_filter:
+        query["status"] = status_filter
+    if branch:
+        query["studentBranch"] = branch
+    if student_id:
+        query["studentId"] = student_id
+    query.update(leave_overlap(on_leave_from, on_leave_to))
+    
+    # Until the date migration finishes the overlap is matched on converted dates, or string leaves would drop out
+    leaves = await (await find_by_date(
+        "leaveApplications", query, {"_id": 0}, "createdAt", -1, limit=1000
+    )).to_list(1000)
     return [LeaveApplication(**leave) for leave in leaves]
 
 @api_router.post("/admin/leave-applications/action")
@@ -852,13 +2069,13 @@ async def handle_leave_action(input: LeaveAction):
             id=str(uuid.uuid4()),
             studentId=leave["studentId"],
             title="Leave Application Approved ✅",
-            message=f"Your leave application from {leave['fromDate']} to {leave['toDate']} has been approved.",
+            message=f"Your leave application from {as_datetime(leave['fromDate']).date()} to {as_datetime(leave['toDate']).date()} has been approved.",
             type="leave",
             relatedId=input.leaveId,
             isRead=False,
-            createdAt=datetime.now(timezone.utc).isoformat()
+            createdAt=datetime.now(timezone.utc)
         )
-        await db.notifications.insert_one(notification.model_dump())
+        await insert_notifications([notification])
         return {"message": "Leave approved successfully"}
     elif input.action == "reject":
         await db.leaveApplications.update_one(
@@ -870,17 +2087,54 @@ async def handle_leave_action(input: LeaveAction):
             id=str(uuid.uuid4()),
             studentId=leave["studentId"],
             title="Leave Application Rejected ❌",
-            message=f"Your leave application from {leave['fromDate']} to {leave['toDate']} has been rejected.",
+            message=f"Your leave application from {as_datetime(leave['fromDate']).date()} to {as_datetime(leave['toDate']).date()} has been rejected.",
             type="leave",
             relatedId=input.leaveId,
             isRead=False,
-            createdAt=datetime.now(timezone.utc).isoformat()
+            createdAt=datetime.now(timezone.utc)
         )
-        await db.notifications.insert_one(notification.model_dump())
+        await insert_notifications([notification])
         return {"message": "Leave rejected successfully"}
     else:
         raise HTTPException(status_code=400, detail="Invalid action")
 
+@api_router.post("/admin/leave-applications/batch-action")
+async def handle_leave_batch_action(input: LeaveBatchAction):
+    ids = [a.leaveId for a in input.actions]
+    leaves = {
+        leave["id"]: leave for leave in await db.leaveApplications.find({"id": {"$in": ids}}, {"_id": 0}).to_list(None)
+    }
+    actions, results = split_batch(input.actions, "leaveId", leaves, "Leave application not found")
+    if not actions:
+        return batch_response(results)
+    
+    await db.leaveApplications.bulk_write([
+        UpdateOne({"id": a.leaveId}, {"$set": {"status": BATCH_ACTIONS[a.action], "adminComment": a.comment}})
+        for a in actions
+    ], ordered=False)
+    
+    now = datetime.now(timezone.utc)
+    notifications = []
+    for a in actions:
+        leave = leaves[a.leaveId]
+        if a.action == "approve":
+            title = "Leave Application Approved ✅"
+        else:
+            title = "Leave Application Rejected ❌"
+        notifications.append(Notification(
+            id=str(uuid.uuid4()),
+            studentId=leave["studentId"],
+            title=title,
+            message=f"Your leave application from {as_datetime(leave['fromDate']).date()} to {as_datetime(leave['toDate']).date()} has been {BATCH_ACTIONS[a.action]}.",
+            type="leave",
+            relatedId=a.leaveId,
+            isRead=False,
+            createdAt=now
+        ))
+    await insert_notifications(notifications)
+    
+    return batch_response(results)
+
 @api_router.delete("/leave-applications/{leave_id}")
 async def delete_leave(leave_id: str):
     result = await db.leaveApplications.delete_one({"id": leave_id})
@@ -888,8 +2142,768 @@ async def delete_leave(leave_id: str):
         raise HTTPException(status_code=404, detail="Leave application not found")
     return {"message": "Leave application deleted successfully"}
 
+# Analytics
+# Summaries are maintained by aggregation pipelines that $merge into their own collections, so reads are O(result)
+ANALYTICS_ROW_LIMIT = 1000
+
+def interest_popularity_pipeline(partitions):
+    match = [] if partitions is None else [{"$match": {"$or": [{"branch": b, "year": y} for b, y in partitions]}}]
+    return match + [
+        {"$unwind": "$interests"},
+        {"$group": {
+            "_id": {"interest": "$interests", "branch": "$branch", "year": "$year"},
+            "students": {"$sum": 1}
+        }},
+        {"$set": {"interest": "$_id.interest", "branch": "$_id.branch", "year": "$_id.year"}}
+    ]
+
+def team_interests_pipeline(partitions):
+    match = [] if partitions is None else [{"$match": {"interests": {"$in": list(partitions)}}}]
+    # Matching again after the unwind keeps a team's other interests from being overwritten with partial counts
+    return match + [{"$unwind": "$interests"}] + match + [
+        {"$group": {
+            "_id": "$interests",
+            "teams": {"$sum": 1},
+            "approvedTeams": {"$sum": {"$cond": [{"$eq": ["$status", "approved"]}, 1, 0]}},
+            "members": {"$sum": {"$add": [1, {"$size": {"$ifNull": ["$memberIds", []]}}]}}
+        }},
+        {"$set": {"interest": "$_id"}}
+    ]
+
+def event_rsvp_pipeline(partitions):
+    match = [] if partitions is None else [{"$match": {"id": {"$in": list(partitions)}}}]
+    return match + [
+        {"$project": {
+            "_id": "$id",
+            "eventId": "$id",
+            "name": 1,
+            "createdAt": 1,
+            "interested": {"$size": {"$ifNull": ["$interestedStudents", []]}},
+            "notInterested": {"$size": {"$ifNull": ["$notInterestedStudents", []]}}
+        }}
+    ]
+
+def student_partitions(doc: dict):
+    return [(doc.get("branch"), doc.get("year"))]
+
+def team_partitions(doc: dict):
+    return doc.get("interests", [])
+
+def event_partitions(doc: dict):
+    return [doc["id"]]
+
+# A change only dirties the partitions of the document it touched; "fields" are those that pick the partition
+# and "watched" those the view reads, so updates to anything else never reach the refresh
+ANALYTICS_VIEWS = {
+    "interestPopularity": {
+        "source": "students",
+        "into": "analyticsInterestPopularity",
+        "pipeline": interest_popularity_pipeline,
+        "fields": {"branch", "year"},
+        "watched": ["branch", "year", "interests"],
+        "partitions": student_partitions,
+        "scope": lambda partitions: {"$or": [{"branch": b, "year": y} for b, y in partitions]}
+    },
+    "teamInterests": {
+        "source": "teams",
+        "into": "analyticsTeamInterests",
+        "pipeline": team_interests_pipeline,
+        "fields": {"interests"},
+        "watched": ["interests", "status", "memberIds"],
+        "partitions": team_partitions,
+        "scope": lambda partitions: {"interest": {"$in": list(partitions)}}
+    },
+    "eventRsvp": {
+        "source": "events",
+        "into": "analyticsEventRsvp",
+        "pipeline": event_rsvp_pipeline,
+        "fields": {"id"},
+        "watched": ["id", "name", "createdAt", "interestedStudents", "notInterestedStudents"],
+        "partitions": event_partitions,
+        "scope": lambda partitions: {"eventId": {"$in": list(partitions)}}
+    },
+}
+
+def changed_partitions(view: dict, change: dict):
+    # Without pre-images the old partition of a delete or a moved document is unknown, so those need a full rebuild
+    if change["operationType"] not in ("insert", "update") or change.get("fullDocument") is None:
+        return None
+    description = change.get("updateDescription") or {}
+    touched = {*description.get("updatedFields", {}), *description.get("removedFields", [])}
+    if {field.split(".")[0] for field in touched} & view["fields"]:
+        return None
+    return view["partitions"](change["fullDocument"])
+
+def watched_changes(view: dict) -> list:
+    # Updated and removed fields can be dotted paths into arrays, so they are compared by their top-level name
+    def touches(paths):
+        return {"$gt": [{"$size": {"$filter": {
+            "input": paths,
+            "cond": {"$in": [{"$arrayElemAt": [{"$split": ["$$this", "."]}, 0]}, view["watched"]]}
+        }}}, 0]}
+    
+    return [{"$match": {"$expr": {"$or": [
+        {"$ne": ["$operationType", "update"]},
+        touches({"$map": {"input": {"$objectToArray": "$updateDescription.updatedFields"}, "in": "$$this.k"}}),
+        touches("$updateDescription.removedFields")
+    ]}}}]
+
+async def merge_view(view: dict, partitions=None):
+    started = datetime.now(timezone.utc)
+    await db[view["source"]].aggregate([
+        *view["pipeline"](partitions),
+        {"$set": {"refreshedAt": started}},
+        {"$merge": {"into": view["into"], "on": "_id", "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ], allowDiskUse=True).to_list(None)
+    # Groups that no longer occur in the source were not rewritten by this run
+    scope = {} if partitions is None else view["scope"](partitions)
+    await db[view["into"]].delete_many({**scope, "refreshedAt": {"$lt": started}})
+
+async def drain_changes(view: dict, token):
+    # Returns the partitions touched since the token, or None when the view needs a full rebuild, and the token to resume from
+    partitions = None
+    if token is not None:
+        partitions = set()
+        deadline = time.monotonic() + ANALYTICS_DRAIN_BUDGET_SECONDS
+        # Counter updates such as the unread notification $incs are filtered out by the server
+        async with db[view["source"]].watch(
+            watched_changes(view), full_document="updateLookup", resume_after=token, max_await_time_ms=100
+        ) as stream:
+            while partitions is not None:
+                change = await stream.try_next()
+                if change is None:
+                    break
+                changed = changed_partitions(view, change)
+                # A backlog that outlasts the budget is cheaper to rebuild than to replay
+                if changed is None or time.monotonic() > deadline:
+                    partitions = None
+                else:
+                    partitions.update(changed)
+            token = stream.resume_token
+    if partitions is None:
+        # The rebuild covers every change so far, so the next refresh resumes from the current end of the stream
+        async with db[view["source"]].watch(max_await_time_ms=100) as stream:
+            await stream.try_next()
+            token = stream.resume_token
+    return partitions, token
+
+async def marked_partitions(view: dict, state: dict):
+    # Without change streams, writes the views depend on stamp updatedAt; the overlap covers clock skew between
+    # workers and writes still in flight at the last refresh
+    overlap = timedelta(seconds=ANALYTICS_MARK_OVERLAP_SECONDS)
+    mark = state.get("highWaterMark")
+    # Deleted documents leave nothing to find, so a delete since the last refresh means a rebuild
+    invalidated = state.get("invalidatedAt")
+    if mark is None or (invalidated is not None and invalidated > mark - overlap):
+        return None
+    partitions = set()
+    async for doc in db[view["source"]].find(
+        {"updatedAt": {"$gt": mark - overlap}}, {"_id": 0, **{field: 1 for field in view["fields"]}}
+    ):
+        partitions.update(view["partitions"](doc))
+    return partitions
+
+async def refresh_view(name: str, view: dict) -> bool:
+    state = await db.analyticsState.find_one({"_id": name}) or {}
+    update = {"refreshedAt": datetime.now(timezone.utc)}
+    try:
+        # The stored resume token replays only the source changes made since the last refresh
+        partitions, update["resumeToken"] = await drain_changes(view, state.get("resumeToken"))
+    except OperationFailure as e:
+        if e.code == CHANGE_STREAMS_UNSUPPORTED:
+            partitions = await marked_partitions(view, state)
+            update["highWaterMark"] = update["refreshedAt"]
+        else:
+            # An expired token has lost its history
+            logger.debug(f"Rebuilding {name} analytics after losing the change stream history: {e}")
+            partitions, update["resumeToken"] = await drain_changes(view, None)
+    
+    if partitions is None:
+        await merge_view(view)
+    elif partitions:
+        await merge_view(view, partitions)
+    await db.analyticsState.update_one({"_id": name}, {"$set": update}, upsert=True)
+    return partitions is None or bool(partitions)
+
+async def refresh_analytics():
+    refreshed = [name for name, view in ANALYTICS_VIEWS.items() if await refresh_view(name, view)]
+    if refreshed:
+        logger.info(f"Refreshed analytics: {', '.join(refreshed)}")
+
+async def invalidate_analytics(source: str):
+    names = [name for name, view in ANALYTICS_VIEWS.items() if view["source"] == source]
+    await db.analyticsState.update_many({"_id": {"$in": names}}, {"$set": {"invalidatedAt": datetime.now(timezone.utc)}})
+
+@api_router.get("/admin/analytics/interests")
+async def get_interest_popularity(branch: Optional[str] = None, year: Optional[str] = None):
+    query = {}
+    if branch:
+        query["branch"] = branch
+    if year:
+        query["year"] = year
+    return await db.analyticsInterestPopularity.find(query, {"_id": 0}).sort(
+        [("students", -1), ("interest", 1)]
+    ).limit(ANALYTICS_ROW_LIMIT).to_list(ANALYTICS_ROW_LIMIT)
+
+@api_router.get("/admin/analytics/team-interests")
+async def get_team_interests():
+    return await db.analyticsTeamInterests.find({}, {"_id": 0}).sort(
+        [("teams", -1), ("interest", 1)]
+    ).limit(ANALYTICS_ROW_LIMIT).to_list(ANALYTICS_ROW_LIMIT)
+
+@api_router.get("/admin/analytics/events")
+async def get_event_rsvp_rates():
+    rows = await db.analyticsEventRsvp.find({}, {"_id": 0}).sort(
+        "createdAt", -1
+    ).limit(ANALYTICS_ROW_LIMIT).to_list(ANALYTICS_ROW_LIMIT)
+    total_students = await db.students.estimated_document_count()
+    for row in rows:
+        responded = row["interested"] + row["notInterested"]
+        row["responded"] = responded
+        row["responseRate"] = round(responded / total_students, 4) if total_students else 0.0
+        row["interestRate"] = round(row["interested"] / responded, 4) if responded else 0.0
+    return rows
+
+# Background Jobs
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    type: str
+    status: str
+    attempts: int = 0
+    maxAttempts: int
+    lastError: Optional[str] = None
+    result: Optional[dict] = None
+    createdAt: datetime
+    finishedAt: Optional[datetime] = None
+
+NOTIFICATION_FANOUT_BATCH_SIZE = 1000
+
+job_wakeup = asyncio.Event()
+
+async def enqueue_job(job_type: str, payload: dict, max_attempts: int = JOB_MAX_ATTEMPTS) -> str:
+    job_id = str(uuid.uuid4())
+    await db.jobs.insert_one({
+        "id": job_id,
+        "type": job_type,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "maxAttempts": max_attempts,
+        "runAt": datetime.now(timezone.utc),
+        "createdAt": datetime.now(timezone.utc)
+    })
+    job_wakeup.set()
+    return job_id
+
+async def claim_job():
+    now = datetime.now(timezone.utc)
+    # A running job whose lease lapsed belongs to a worker that died or stalled
+    return await db.jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "runAt": {"$lte": now}},
+            {"status": "running", "lockedUntil": {"$lt": now}, "$expr": {"$lt": ["$attempts", "$maxAttempts"]}}
+        ]},
+        {
+            "$set": {
+                "status": "running",
+                "lockedBy": WORKER_ID,
+                "lockToken": str(uuid.uuid4()),
+                "lockedUntil": now + timedelta(seconds=JOB_VISIBILITY_TIMEOUT_SECONDS)
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("runAt", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def fail_expired_jobs():
+    # A job that keeps killing its worker never reaches run_job's failure handling, so its lapsed lease counts as one
+    now = datetime.now(timezone.utc)
+    result = await db.jobs.update_many(
+        {"status": "running", "lockedUntil": {"$lt": now}, "$expr": {"$gte": ["$attempts", "$maxAttempts"]}},
+        {
+            "$set": {
+                "status": "failed",
+                "lastError": "lease expired",
+                "finishedAt": now,
+                "expiresAt": now + timedelta(days=JOB_RETENTION_DAYS)
+            },
+            "$unset": {"lockToken": "", "lockedUntil": ""}
+        }
+    )
+    if result.modified_count:
+        logger.warning(f"Failed {result.modified_count} jobs whose lease expired on their last attempt")
+
+async def save_job_checkpoint(job: dict, checkpoint):
+    await db.jobs.update_one(
+        {"id": job["id"], "lockToken": job["lockToken"]},
+        {"$set": {"checkpoint": checkpoint}}
+    )
+
+async def extend_job_lease(job: dict):
+    while True:
+        await asyncio.sleep(JOB_VISIBILITY_TIMEOUT_SECONDS / 3)
+        try:
+            await db.jobs.update_one(
+                {"id": job["id"], "lockToken": job["lockToken"]},
+                {"$set": {"lockedUntil": datetime.now(timezone.utc) + timedelta(seconds=JOB_VISIBILITY_TIMEOUT_SECONDS)}}
+            )
+        except Exception as e:
+            logger.warning(f"Could not extend lease for job {job['id']}: {e}")
+
+async def run_job(job: dict):
+    owned = {"id": job["id"], "lockToken": job["lockToken"]}
+    heartbeat = asyncio.create_task(extend_job_lease(job))
+    try:
+        result = await JOB_HANDLERS[job["type"]](job)
+    except Exception as e:
+        logger.warning(f"Job {job['id']} ({job['type']}) failed on attempt {job['attempts']}: {e}")
+        if job["attempts"] < job["maxAttempts"]:
+            update = {
+                "status": "queued",
+                "runAt": datetime.now(timezone.utc) + timedelta(seconds=2 ** job["attempts"]),
+                "lastError": str(e)
+            }
+        else:
+            update = {
+                "status": "failed",
+                "lastError": str(e),
+                "finishedAt": datetime.now(timezone.utc),
+                "expiresAt": datetime.now(timezone.utc) + timedelta(days=JOB_RETENTION_DAYS)
+            }
+        await db.jobs.update_one(owned, {"$set": update, "$unset": {"lockToken": "", "lockedUntil": ""}})
+    else:
+        await db.jobs.update_one(owned, {
+            "$set": {
+                "status": "succeeded",
+                "result": result,
+                "finishedAt": datetime.now(timezone.utc),
+                "expiresAt": datetime.now(timezone.utc) + timedelta(days=JOB_RETENTION_DAYS)
+            },
+            "$unset": {"lockToken": "", "lockedUntil": ""}
+        })
+    finally:
+        heartbeat.cancel()
+
+async def job_worker():
+    await seed_complete.wait()
+    next_expiry_sweep = 0.0
+    while not draining.is_set():
+        try:
+            if time.monotonic() >= next_expiry_sweep:
+                next_expiry_sweep = time.monotonic() + JOB_VISIBILITY_TIMEOUT_SECONDS
+                await fail_expired_jobs()
+            job = await claim_job()
+        except Exception as e:
+            logger.warning(f"Could not claim a job: {e}")
+            job = None
+        
+        if job is None:
+            job_wakeup.clear()
+            try:
+                await asyncio.wait_for(job_wakeup.wait(), timeout=JOB_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        
+        if job["type"] not in JOB_HANDLERS:
+            logger.warning(f"Job {job['id']} has unknown type {job['type']}; leaving it for another version")
+            await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+            continue
+        await run_job(job)
+
+async def notify_all_students_job(job: dict):
+    payload = job["payload"]
+    last_id = job.get("checkpoint") or ""
+    notified = 0
+    while True:
+        students = await db.students.find(
+            {"id": {"$gt": last_id}}, {"_id": 0, "id": 1}
+        ).sort("id", 1).limit(NOTIFICATION_FANOUT_BATCH_SIZE).to_list(NOTIFICATION_FANOUT_BATCH_SIZE)
+        if not students:
+            return {"notified": notified}
+        
+        now = datetime.now(timezone.utc)
+        # Deterministic ids make a retried batch collide instead of notifying twice
+        await insert_notifications([
+            Notification(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{payload['type']}:{payload['relatedId']}:{student['id']}")),
+                studentId=student["id"],
+                title=payload["title"],
+                message=payload["message"],
+                type=payload["type"],
+                relatedId=payload["relatedId"],
+                isRead=False,
+                createdAt=now
+            )
+            for student in students
+        ])
+        last_id = students[-1]["id"]
+        notified += len(students)
+        await save_job_checkpoint(job, last_id)
+
+async def migrate_message_buckets_job(job: dict):
+    last_team_id = job.get("checkpoint") or ""
+    migrated = 0
+    while True:
+        next_message = await db.messages.find_one(
+            {"teamId": {"$gt": last_team_id}}, {"_id": 0, "teamId": 1}, sort=[("teamId", 1)]
+        )
+        if not next_message:
+            return {"migrated": migrated}
+        
+        team_id = next_message["teamId"]
+        while True:
+            batch = await db.messages.find(
+                {"teamId": team_id}, {"_id": 0}
+            ).sort("createdAt", 1).limit(MESSAGE_BUCKET_SIZE).to_list(MESSAGE_BUCKET_SIZE)
+            if not batch:
+                break
+            # The bucket id derives from its first message, so a retried batch upserts the same bucket
+            await db.messageBuckets.update_one(
+                {"id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"message-bucket:{batch[0]['id']}"))},
+                {"$setOnInsert": {
+                    "teamId": team_id,
+                    "messages": [{k: v for k, v in m.items() if k != "teamId"} for m in batch],
+                    "count": MESSAGE_BUCKET_SIZE,
+                    "firstAt": batch[0]["createdAt"],
+                    "lastAt": batch[-1]["createdAt"]
+                }},
+                upsert=True
+            )
+            await db.messages.delete_many({"id": {"$in": [m["id"] for m in batch]}})
+            migrated += len(batch)
+        
+        last_team_id = team_id
+        await save_job_checkpoint(job, last_team_id)
+
+rendition_pool: Optional[ProcessPoolExecutor] = None
+
+def get_rendition_pool() -> ProcessPoolExecutor:
+    global rendition_pool
+    if rendition_pool is None:
+        # Spawned rather than forked: forking a process that runs an event loop and driver threads is unsafe
+        rendition_pool = ProcessPoolExecutor(RENDITION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return rendition_pool
+
+async def render_photo_job(job: dict):
+    payload = job["payload"]
+    upload = await db.uploads.find_one({"id": payload["uploadId"]}, {"_id": 0})
+    if not upload or not upload["contentType"].startswith("image/"):
+        return {"rendered": False}
+    
+    grid_out = await file_bucket().open_download_stream(upload["fileId"])
+    data = await grid_out.read()
+    # Decoding and resizing are CPU bound, so they run outside the event loop's process
+    try:
+        renditions = await asyncio.get_running_loop().run_in_executor(
+            get_rendition_pool(), render_renditions, data, RENDITION_SIZES
+        )
+    except ValueError as e:
+        return {"rendered": False, "error": str(e)}
+    
+    stored = {}
+    for name, content in renditions.items():
+        rendition = await store_bytes(content, f"{name}-{upload['filename']}.jpg", "image/jpeg")
+        stored[f"{name}Url"] = rendition.url
+    await db.photos.update_one({"id": payload["photoId"]}, {"$set": stored})
+    await bump_versions("photos")
+    return {"rendered": True, **stored}
+
+# Fields stored as ISO strings before dates became BSON dates; "array.field" converts inside an array
+DATE_FIELDS = {
+    "students": ["createdAt"],
+    "interests": ["createdAt"],
+    "teams": ["createdAt"],
+    "teamRequests": ["createdAt"],
+    "events": ["createdAt"],
+    "competitions": ["createdAt"],
+    "notifications": ["createdAt"],
+    "notificationsArchive": ["createdAt"],
+    "messages": ["createdAt"],
+    "messageBuckets": ["firstAt", "lastAt", "messages.createdAt"],
+    "photos": ["createdAt"],
+    "leaveApplications": ["createdAt", "fromDate", "toDate"],
+    "jobs": ["createdAt", "finishedAt"],
+}
+
+def date_conversion(doc: dict, fields: List[str]):
+    changes, expected = {}, {}
+    for field in fields:
+        if "." in field:
+            array, inner = field.split(".")
+            items = doc.get(array) or []
+            if any(isinstance(item.get(inner), str) for item in items):
+                changes[array] = [
+                    {**item, inner: as_datetime(item[inner])} if isinstance(item.get(inner), str) else item
+                    for item in items
+                ]
+                expected[array] = items
+        elif isinstance(doc.get(field), str):
+            changes[field] = as_datetime(doc[field])
+            expected[field] = doc[field]
+    # Matching on the old values skips a document that changed since it was read
+    return UpdateOne({"_id": doc["_id"], **expected}, {"$set": changes})
+
+async def migrate_dates_job(job: dict):
+    checkpoint = job.get("checkpoint") or {}
+    collections = list(DATE_FIELDS)
+    if checkpoint:
+        collections = collections[collections.index(checkpoint["collection"]):]
+    converted = 0
+    for collection in collections:
+        fields = DATE_FIELDS[collection]
+        pending = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        last_id = checkpoint.get("lastId") if checkpoint.get("collection") == collection else None
+        while True:
+            query = pending if last_id is None else {"$and": [pending, {"_id": {"$gt": last_id}}]}
+            docs = await db[collection].find(
+                query, {field.split(".")[0]: 1 for field in fields}
+            ).sort("_id", 1).limit(DATE_MIGRATION_BATCH_SIZE).to_list(DATE_MIGRATION_BATCH_SIZE)
+            if not docs:
+                # A second pass picks up documents that changed under an earlier batch
+                if last_id is None or not await db[collection].find_one(pending, {"_id": 1}):
+                    break
+                last_id = None
+                continue
+            
+            result = await db[collection].bulk_write([date_conversion(doc, fields) for doc in docs], ordered=False)
+            converted += result.modified_count
+            last_id = docs[-1]["_id"]
+            await save_job_checkpoint(job, {"collection": collection, "lastId": last_id})
+            # Small batches with a pause leave room for request traffic
+            await asyncio.sleep(DATE_MIGRATION_PAUSE_SECONDS)
+    await record_migration(DATES_MIGRATION_ID)
+    return {"converted": converted}
+
+async def delete_students_job(job: dict):
+    return {"deleted": await delete_students_cascade(job["payload"]["ids"])}
+
+async def delete_teams_job(job: dict):
+    return {"deleted": await delete_teams_cascade(job["payload"]["ids"])}
+
+JOB_HANDLERS = {
+    "notify_all_students": notify_all_students_job,
+    "delete_students": delete_students_job,
+    "delete_teams": delete_teams_job,
+    "migrate_message_buckets": migrate_message_buckets_job,
+    "migrate_dates": migrate_dates_job,
+    "render_photo": render_photo_job,
+}
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return Job(**job)
+
+@api_router.get("/health/live")
+async def health_live():
+    return {"status": "alive", "pool": pool_stats.snapshot()}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    pool = pool_stats.snapshot()
+    report = {"status": "ready", "seeded": seed_complete.is_set(), "pool": pool, "pingMs": None}
+    
+    try:
+        started = time.perf_counter()
+        await asyncio.wait_for(client.admin.command("ping"), timeout=HEALTH_PING_TIMEOUT_SECONDS)
+        report["pingMs"] = round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        report["status"] = "database unreachable"
+        report["error"] = str(e)
+        raise HTTPException(status_code=503, detail=report)
+    
+    if not report["seeded"]:
+        report["status"] = "startup seeding in progress"
+        raise HTTPException(status_code=503, detail=report)
+    
+    if pool["waiting"] > HEALTH_MAX_POOL_WAITERS:
+        report["status"] = "connection pool saturated"
+        raise HTTPException(status_code=503, detail=report)
+    
+    return report
+
+# Request Metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+class RouteMetrics:
+    __slots__ = ("latency", "request_size", "response_size", "statuses", "errors")
+    
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_size = Histogram(SIZE_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+        self.statuses = {}
+        self.errors = 0
+
+# Updated only from this worker's event loop, so no locking is needed
+route_metrics = {}
+
+def record_request(method, route, status_code, duration, request_bytes, response_bytes):
+    key = (method, route)
+    metrics = route_metrics.get(key)
+    if metrics is None:
+        metrics = route_metrics[key] = RouteMetrics()
+    metrics.latency.observe(duration)
+    metrics.request_size.observe(request_bytes)
+    metrics.response_size.observe(response_bytes)
+    metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+    if status_code >= 500:
+        metrics.errors += 1
+
+def render_metrics():
+    sections = {
+        "http_requests_total": ("counter", "Requests handled, by route template and status code", []),
+        "http_request_errors_total": ("counter", "Requests that failed with a 5xx status", []),
+        "http_request_duration_seconds": ("histogram", "Request latency in seconds", []),
+        "http_request_size_bytes": ("histogram", "Request body size in bytes", []),
+        "http_response_size_bytes": ("histogram", "Response body size in bytes", []),
+        "response_cache_requests_total": ("counter", "Cached loader calls, by result", [
+            f'response_cache_requests_total{{result="hit"}} {response_cache.hits}',
+            f'response_cache_requests_total{{result="miss"}} {response_cache.misses}'
+        ]),
+        "response_cache_entries": ("gauge", "Entries held in this worker's response cache", [
+            f'response_cache_entries {len(response_cache.entries)}'
+        ]),
+        "coalesced_requests_total": ("counter", "Requests that shared an identical in-flight load, by loader", [
+            f'coalesced_requests_total{{loader="{loader}"}} {count}'
+            for loader, count in sorted(coalesced_requests.items())
+        ]),
+        "admission_in_flight": ("gauge", "Admission-controlled requests running in this worker", [
+            f'admission_in_flight {admission_controller.in_flight}'
+        ]),
+        "admission_queued": ("gauge", "Admission-controlled requests waiting for a slot", [
+            f'admission_queued {admission_controller.queued}'
+        ]),
+        "requests_shed_total": ("counter", "Requests rejected by rate limits or admission control", [
+            f'requests_shed_total{{policy="{policy}",reason="{reason}"}} {count}'
+            for (policy, reason), count in sorted(shed_requests.items())
+        ]),
+    }
+    for (method, route), metrics in sorted(route_metrics.items()):
+        labels = f'method="{method}",route="{route}"'
+        for status_code, count in sorted(metrics.statuses.items()):
+            sections["http_requests_total"][2].append(f'http_requests_total{{{labels},status="{status_code}"}} {count}')
+        sections["http_request_errors_total"][2].append(f'http_request_errors_total{{{labels}}} {metrics.errors}')
+        sections["http_request_duration_seconds"][2].extend(metrics.latency.render("http_request_duration_seconds", labels))
+        sections["http_request_size_bytes"][2].extend(metrics.request_size.render("http_request_size_bytes", labels))
+        sections["http_response_size_bytes"][2].extend(metrics.response_size.render("http_response_size_bytes", labels))
+    
+    lines = []
+    for name, (kind, help_text, samples) in sections.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        request_bytes = 0
+        response = {"status": 500, "bytes": 0}
+        
+        async def receive_wrapper():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            # Label by route template so path parameters don't explode cardinality
+            route = scope.get("route")
+            record_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                response["status"],
+                time.perf_counter() - started,
+                request_bytes,
+                response["bytes"]
+            )
+
+class QueryAccountingMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        tracker = QueryTracker()
+        token = current_query_tracker.set(tracker)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                timing = f'mongo;dur={tracker.duration_micros / 1000:.2f};desc="{tracker.commands} commands"'
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_tracker.reset(token)
+            for shape, count in tracker.shapes.items():
+                if count > N_PLUS_ONE_THRESHOLD:
+                    logger.warning(
+                        f"Possible N+1: {scope['method']} {scope['path']} ran {count} commands of shape {shape}"
+                    )
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(api_router)
 
+app.add_middleware(UploadLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -898,28 +2912,418 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(QueryAccountingMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-@app.on_event("startup")
-async def startup_db():
-    default_interests = [
-        "Dance", "Singing", "Painting", "Poster Making",
-        "Web Development", "Backend", "C", "Java"
+DEFAULT_INTERESTS = [
+    "Dance", "Singing", "Painting", "Poster Making",
+    "Web Development", "Backend", "C", "Java"
+]
+STARTUP_LOCK_ID = "startup-seed"
+STARTUP_LOCK_LEASE_SECONDS = 60
+RETENTION_LOCK_ID = "notification-retention"
+RETENTION_BATCH_SIZE = 1000
+UNREAD_COUNTERS_MIGRATION_ID = "unread-counters"
+NOTIFICATION_COUNTS_MIGRATION_ID = "notification-counts"
+UNREAD_BACKFILL_BATCH_SIZE = 1000
+ANALYTICS_LOCK_ID = "analytics-refresh"
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+seed_complete = asyncio.Event()
+draining = asyncio.Event()
+background_tasks: List[asyncio.Task] = []
+
+async def acquire_lease(lock_id: str, lease_seconds: int) -> bool:
+    now = datetime.now(timezone.utc)
+    try:
+        # Matches only an expired lease; a live one makes the upsert collide on _id
+        await db.startupLocks.find_one_and_update(
+            {"_id": lock_id, "expiresAt": {"$lt": now}},
+            {"$set": {
+                "owner": WORKER_ID,
+                "expiresAt": now + timedelta(seconds=lease_seconds),
+                "completedAt": None
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def extend_lease(lock_id: str, lease_seconds: int):
+    # Like extend_job_lease: the owner renews until its work ends, however long the indexes and backfills take
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        try:
+            await db.startupLocks.update_one(
+                {"_id": lock_id, "owner": WORKER_ID},
+                {"$set": {"expiresAt": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)}}
+            )
+        except Exception as e:
+            logger.warning(f"Could not extend lease {lock_id}: {e}")
+
+async def seed_default_interests():
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"name": name},
+            {"$setOnInsert": {"id": str(uuid.uuid4()), "createdAt": now}},
+            upsert=True
+        )
+        for name in DEFAULT_INTERESTS
     ]
-    for interest_name in default_interests:
-        existing = await db.interests.find_one({"name": interest_name})
-        if not existing:
-            interest = Interest(
-                id=str(uuid.uuid4()),
-                name=interest_name,
-                createdAt=datetime.now(timezone.utc).isoformat()
+    result = await db.interests.bulk_write(operations, ordered=False)
+    if result.upserted_count:
+        await bump_versions("interests")
+    logger.info(f"Seeded {result.upserted_count} default interests")
+
+INDEXES = [
+    ("students", [("id", 1)], {"unique": True}),
+    ("students", [("rollNumber", 1)], {"unique": True}),
+    ("students", [("notificationCount", 1)], {}),
+    ("interests", [("name", 1)], {"unique": True}),
+    ("notifications", [("id", 1)], {"unique": True}),
+    ("notifications", [("studentId", 1), ("createdAt", -1)], {}),
+    ("notifications", [("studentId", 1), ("isRead", 1)], {}),
+    ("notifications", [("readAt", 1)], {
+        "expireAfterSeconds": NOTIFICATION_READ_TTL_DAYS * 86400,
+        "partialFilterExpression": {"isRead": True}
+    }),
+    ("notificationsArchive", [("id", 1)], {"unique": True}),
+    ("notificationsArchive", [("studentId", 1), ("createdAt", -1)], {}),
+    ("notificationsArchive", [("archivedAt", 1)], {"expireAfterSeconds": NOTIFICATION_ARCHIVE_TTL_DAYS * 86400}),
+    ("events", [("createdAt", 1)], {}),
+    ("competitions", [("createdAt", 1)], {}),
+    ("photos", [("createdAt", -1)], {}),
+    ("messages", [("teamId", 1), ("createdAt", 1)], {}),
+    ("students", [("branch", 1), ("year", 1)], {}),
+    ("teams", [("interests", 1)], {}),
+    ("students", [("updatedAt", 1)], {}),
+    ("teams", [("updatedAt", 1)], {}),
+    ("events", [("updatedAt", 1)], {}),
+    ("analyticsInterestPopularity", [("branch", 1), ("year", 1), ("students", -1)], {}),
+    ("analyticsTeamInterests", [("teams", -1)], {}),
+    ("analyticsEventRsvp", [("createdAt", -1)], {}),
+    ("leaveApplications", [("status", 1), ("createdAt", -1)], {}),
+    ("leaveApplications", [("studentBranch", 1), ("status", 1), ("createdAt", -1)], {}),
+    ("leaveApplications", [("studentId", 1), ("createdAt", -1)], {}),
+    ("leaveApplications", [("status", 1), ("fromDate", 1), ("toDate", 1)], {}),
+    ("messageBuckets", [("id", 1)], {"unique": True}),
+    ("messageBuckets", [("teamId", 1), ("firstAt", 1)], {}),
+    ("uploads", [("id", 1)], {"unique": True}),
+    ("jobs", [("id", 1)], {"unique": True}),
+    ("jobs", [("status", 1), ("runAt", 1)], {}),
+    ("jobs", [("status", 1), ("lockedUntil", 1)], {}),
+    ("jobs", [("expiresAt", 1)], {"expireAfterSeconds": 0}),
+]
+
+async def ensure_indexes():
+    for collection, keys, options in INDEXES:
+        try:
+            await db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            if "expireAfterSeconds" in options and e.code in (85, 86):
+                # Retention was reconfigured; update the existing TTL in place
+                await db.command("collMod", collection, index={
+                    "keyPattern": dict(keys),
+                    "expireAfterSeconds": options["expireAfterSeconds"]
+                })
+            elif options.get("unique"):
+                # Running without a unique index silently brings back the races it closes, so startup stops here
+                raise RuntimeError(f"Could not create unique {collection} index {keys}: {e}")
+            else:
+                logger.warning(f"Could not create {collection} index {keys}: {e}")
+
+async def archive_overflow_notifications(student_id: str) -> int:
+    archived = 0
+    while True:
+        overflow = await db.notifications.find(
+            {"studentId": student_id}, {"_id": 0}
+        ).sort("createdAt", -1).skip(NOTIFICATION_MAX_PER_STUDENT).limit(RETENTION_BATCH_SIZE).to_list(RETENTION_BATCH_SIZE)
+        if not overflow:
+            return archived
+        
+        now = datetime.now(timezone.utc)
+        try:
+            await db.notificationsArchive.insert_many(
+                [{**n, "archivedAt": now} for n in overflow], ordered=False
             )
-            await db.interests.insert_one(interest.model_dump())
+        except BulkWriteError as e:
+            # Entries left behind by an interrupted run are already archived
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        
+        ids = [n["id"] for n in overflow]
+        result = await db.notifications.delete_many({"id": {"$in": ids}})
+        unread = sum(1 for n in overflow if not n.get("isRead"))
+        await db.students.update_one(
+            {"id": student_id},
+            {"$inc": {"unreadNotifications": -unread, "notificationCount": -result.deleted_count}}
+        )
+        archived += len(overflow)
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+async def enforce_notification_retention():
+    # Counters from before notificationCount existed would hide students over the cap, and
+    # while createdAt mixes strings and dates the sort below would pick the newest notifications
+    if not await migration_complete(NOTIFICATION_COUNTS_MIGRATION_ID) or not await dates_migrated():
+        return
+    
+    over_cap = await db.students.find(
+        {"notificationCount": {"$gt": NOTIFICATION_MAX_PER_STUDENT}},
+        {"_id": 0, "id": 1, "notificationCount": 1}
+    ).to_list(None)
+    archived = 0
+    for student in over_cap:
+        moved = await archive_overflow_notifications(student["id"])
+        if not moved:
+            # TTL expiry deletes read notifications without decrementing the counter, which then overstates
+            actual = await db.notifications.count_documents({"studentId": student["id"]})
+            await db.students.update_one(
+                {"id": student["id"], "notificationCount": student["notificationCount"]},
+                {"$set": {"notificationCount": actual}}
+            )
+        archived += moved
+    if archived:
+        logger.info(f"Archived {archived} notifications for {len(over_cap)} students over the retention cap")
+
+async def run_notification_retention():
+    await seed_complete.wait()
+    while True:
+        try:
+            # One worker per interval does the sweep; the lease simply expires
+            if await acquire_lease(RETENTION_LOCK_ID, NOTIFICATION_RETENTION_INTERVAL_SECONDS):
+                await enforce_notification_retention()
+        except Exception as e:
+            logger.warning(f"Notification retention sweep failed: {e}")
+        await asyncio.sleep(NOTIFICATION_RETENTION_INTERVAL_SECONDS)
+
+async def run_analytics_refresh():
+    await seed_complete.wait()
+    while True:
+        try:
+            # Like retention, one worker per interval refreshes the summaries
+            if await acquire_lease(ANALYTICS_LOCK_ID, ANALYTICS_REFRESH_INTERVAL_SECONDS):
+                await refresh_analytics()
+        except Exception as e:
+            logger.warning(f"Analytics refresh failed: {e}")
+        await asyncio.sleep(ANALYTICS_REFRESH_INTERVAL_SECONDS)
+
+# Error code for change streams on a standalone server
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+async def watch_versions():
+    # Other workers' writes reach this worker's response cache through collectionVersions
+    use_change_stream = True
+    while True:
+        try:
+            keys = sorted(cached_dependencies)
+            for doc in await db.collectionVersions.find({"_id": {"$in": keys}}).to_list(None):
+                observe_version(doc)
+            if use_change_stream:
+                async with db.collectionVersions.watch(
+                    [{"$match": {"documentKey._id": {"$in": keys}}}], full_document="updateLookup"
+                ) as stream:
+                    async for change in stream:
+                        if change.get("fullDocument"):
+                            observe_version(change["fullDocument"])
+        except asyncio.CancelledError:
+            raise
+        except OperationFailure as e:
+            if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                # Standalone servers are polled instead
+                use_change_stream = False
+            else:
+                logger.warning(f"Collection version watch failed, retrying: {e}")
+        except Exception as e:
+            logger.warning(f"Collection version watch failed, retrying: {e}")
+        # Any failure, including of the poll itself, only delays the next attempt
+        await asyncio.sleep(VERSION_POLL_INTERVAL_SECONDS)
+
+async def backfill_team_members():
+    # Teams created before member summaries were denormalized carry an empty members list
+    teams = await db.teams.find(
+        {"$expr": {"$ne": [{"$size": {"$ifNull": ["$members", []]}}, {"$size": {"$ifNull": ["$memberIds", []]}}]}},
+        {"_id": 0, "id": 1, "memberIds": 1}
+    ).to_list(None)
+    if not teams:
+        return
+    
+    member_ids = list({m for team in teams for m in team.get("memberIds", [])})
+    names = {
+        s["id"]: s["name"] for s in await db.students.find(
+            {"id": {"$in": member_ids}}, {"_id": 0, "id": 1, "name": 1}
+        ).to_list(None)
+    }
+    # Ids of students that no longer exist are pulled, as deleting a student does, so the next startup finds nothing to do
+    result = await db.teams.bulk_write([
+        UpdateOne(
+            {"id": team["id"], "memberIds": team.get("memberIds", [])},
+            {"$set": {
+                "memberIds": [m for m in team.get("memberIds", []) if m in names],
+                "members": [{"id": m, "name": names[m]} for m in team.get("memberIds", []) if m in names],
+                "updatedAt": datetime.now(timezone.utc)
+            }}
+        )
+        for team in teams
+    ], ordered=False)
+    if result.modified_count:
+        await bump_versions("teams")
+        logger.info(f"Backfilled member summaries on {result.modified_count} teams")
+
+async def migration_complete(migration_id: str) -> bool:
+    return await db.migrations.find_one({"_id": migration_id, "completedAt": {"$ne": None}}, {"_id": 1}) is not None
+
+async def record_migration(migration_id: str):
+    await db.migrations.update_one(
+        {"_id": migration_id},
+        {"$set": {"completedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+async def backfill_student_counter(migration_id: str, counter: str, flag: str, counted: dict):
+    if await migration_complete(migration_id):
+        return
+    
+    # Requests keep $inc-ing the counter meanwhile; readers trust it only after the flag is set
+    pending = {flag: {"$ne": True}}
+    matches = {"$and": [{"$eq": [f"${field}", value]} for field, value in counted.items()]} if counted else True
+    settled = 0
+    skipped = []
+    while True:
+        students = await db.students.find(
+            {**pending, "id": {"$nin": skipped}}, {"_id": 0, "id": 1, counter: 1}
+        ).limit(UNREAD_BACKFILL_BATCH_SIZE).to_list(UNREAD_BACKFILL_BATCH_SIZE)
+        if not students:
+            break
+        
+        groups = {
+            c["_id"]: c for c in await db.notifications.aggregate([
+                {"$match": {"studentId": {"$in": [s["id"] for s in students]}}},
+                {"$group": {
+                    "_id": "$studentId",
+                    "count": {"$sum": {"$cond": [matches, 1, 0]}},
+                    "uncounted": {"$sum": {"$cond": [{"$eq": ["$counted", False]}, 1, 0]}}
+                }}
+            ]).to_list(None)
+        }
+        # A notification whose increment hasn't landed would be counted twice, so its student waits for a later run
+        waiting = [s["id"] for s in students if groups.get(s["id"], {}).get("uncounted")]
+        skipped += waiting
+        # A counter that moved after it was read may be missing from the count, so that student is retried
+        operations = [
+            UpdateOne(
+                {"id": s["id"], counter: s.get(counter, {"$exists": False}), **pending},
+                {"$set": {counter: groups.get(s["id"], {}).get("count", 0), flag: True}}
+            )
+            for s in students if s["id"] not in waiting
+        ]
+        if operations:
+            result = await db.students.bulk_write(operations, ordered=False)
+            settled += result.modified_count
+    if skipped:
+        logger.info(f"Backfilled {counter} for {settled} students; {len(skipped)} wait for a later startup")
+        return
+    await record_migration(migration_id)
+    logger.info(f"Backfilled {counter} for {settled} students")
+
+# Collections that refer to a student by id, for folding duplicate students into one
+STUDENT_REFERENCES = ["teamRequests", "messages", "notifications", "notificationsArchive", "leaveApplications"]
+STUDENT_ARRAY_REFERENCES = [
+    ("teams", "memberIds"),
+    ("events", "interestedStudents"),
+    ("events", "notInterestedStudents"),
+    ("photos", "likes"),
+]
+
+async def merge_duplicate_students():
+    # Racing first logins left some roll numbers with several students, which keeps the unique index from building
+    indexes = await db.students.index_information()
+    if any(index["key"] == [("rollNumber", 1)] and index.get("unique") for index in indexes.values()):
+        return
+    
+    groups = await db.students.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": "$rollNumber", "ids": {"$push": "$id"}}},
+        {"$match": {"ids.1": {"$exists": True}}}
+    ], allowDiskUse=True).to_list(None)
+    for group in groups:
+        # The first student created is kept and everything the others touched is moved onto it
+        keep, duplicates = group["ids"][0], group["ids"][1:]
+        others = await db.students.find({"id": {"$in": duplicates}}, {"_id": 0}).to_list(None)
+        await db.students.update_one({"id": keep}, {
+            "$addToSet": {
+                "interests": {"$each": [i for s in others for i in s.get("interests", [])]},
+                "teams": {"$each": [t for s in others for t in s.get("teams", [])]}
+            },
+            **({"$set": {"isLeader": True}} if any(s.get("isLeader") for s in others) else {})
+        })
+        for collection in STUDENT_REFERENCES:
+            await db[collection].update_many({"studentId": {"$in": duplicates}}, {"$set": {"studentId": keep}})
+        await db.teams.update_many({"leaderId": {"$in": duplicates}}, {"$set": {"leaderId": keep}})
+        for collection, field in STUDENT_ARRAY_REFERENCES:
+            await db[collection].update_many({field: {"$in": duplicates}}, {"$addToSet": {field: keep}})
+            await db[collection].update_many({field: {"$in": duplicates}}, {"$pull": {field: {"$in": duplicates}}})
+        # A leader is not listed among its own team's members
+        await db.teams.update_many({"leaderId": keep, "memberIds": keep}, {"$pull": {"memberIds": keep, "members": {"id": keep}}})
+        # backfill_team_members rebuilds the summaries of teams whose members no longer match memberIds
+        await db.teams.update_many({"members.id": {"$in": duplicates}}, {"$pull": {"members": {"id": {"$in": duplicates}}}})
+        await db.students.update_one({"id": keep}, {"$set": {
+            "unreadNotifications": await db.notifications.count_documents({"studentId": keep, "isRead": False}),
+            "notificationCount": await db.notifications.count_documents({"studentId": keep})
+        }})
+        await db.students.delete_many({"id": {"$in": duplicates}})
+    if groups:
+        await bump_versions("teams", "events", "photos")
+        logger.warning(f"Merged duplicate students for {len(groups)} roll numbers")
+
+async def schedule_date_migration():
+    # A fresh database finishes at once; one with string dates converts in the background while reads fall back
+    if await migration_complete(DATES_MIGRATION_ID):
+        return
+    if not await db.jobs.find_one({"type": "migrate_dates", "status": {"$in": ["queued", "running"]}}, {"_id": 1}):
+        await enqueue_job("migrate_dates", {})
+
+async def backfill_unread_counters():
+    await backfill_student_counter(UNREAD_COUNTERS_MIGRATION_ID, "unreadNotifications", "unreadCounted", {"isRead": False})
+
+async def backfill_notification_counts():
+    await backfill_student_counter(NOTIFICATION_COUNTS_MIGRATION_ID, "notificationCount", "notificationsCounted", {})
+
+async def run_startup_tasks():
+    while not seed_complete.is_set():
+        try:
+            if await acquire_lease(STARTUP_LOCK_ID, STARTUP_LOCK_LEASE_SECONDS):
+                heartbeat = asyncio.create_task(extend_lease(STARTUP_LOCK_ID, STARTUP_LOCK_LEASE_SECONDS))
+                try:
+                    await merge_duplicate_students()
+                    await ensure_indexes()
+                    await seed_default_interests()
+                    await backfill_unread_counters()
+                    await backfill_notification_counts()
+                    await schedule_date_migration()
+                    await backfill_team_members()
+                finally:
+                    heartbeat.cancel()
+                result = await db.startupLocks.update_one(
+                    {"_id": STARTUP_LOCK_ID, "owner": WORKER_ID},
+                    {"$set": {"completedAt": datetime.now(timezone.utc)}}
+                )
+                if result.matched_count == 0:
+                    logger.warning("Startup lease was taken over before seeding finished; another worker may have seeded too")
+                seed_complete.set()
+                break
+            
+            # Another worker holds the lease; wait for it to finish or expire
+            lock = await db.startupLocks.find_one({"_id": STARTUP_LOCK_ID})
+            if lock and lock.get("completedAt"):
+                seed_complete.set()
+                break
+        except Exception as e:
+            logger.warning(f"Startup seeding failed, retrying: {e}")
+        await asyncio.sleep(0.5)
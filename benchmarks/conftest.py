@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+from pymongo import MongoClient
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "camplink_bench")
+
+import server
+from generate_dataset import DatasetGenerator
+
+BASELINE_PATH = Path(__file__).parent / "baselines.json"
+RESULTS_PATH = Path(__file__).parent / "results.json"
+DATASET_SIZES = [int(size) for size in os.environ.get("BENCH_SIZES", "1000,10000").split(",")]
+
+def pytest_addoption(parser):
+    parser.addoption("--update-baselines", action="store_true",
+                     help="Overwrite stored baselines with this run's results")
+    parser.addoption("--regression-threshold", type=float, default=1.5,
+                     help="Fail when a handler's median exceeds baseline by this factor")
+    parser.addoption("--bench-rounds", type=int, default=20)
+
+@pytest.fixture(scope="session")
+def bench_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def mongo():
+    client = MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except Exception as e:
+        pytest.skip(f"Benchmarks need a local mongod: {e}")
+    yield client
+    client.close()
+
+@pytest.fixture(scope="session")
+def baselines(request):
+    stored = json.loads(BASELINE_PATH.read_text())
+    results = {}
+    yield stored, results
+    # baselines.json is the committed reference and only changes on request; each run's numbers go to results.json
+    RESULTS_PATH.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    if request.config.getoption("--update-baselines"):
+        stored.update(results)
+        BASELINE_PATH.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+
+@pytest.fixture(scope="session", params=DATASET_SIZES, ids=lambda size: f"{size}-students")
+def dataset(request, mongo, bench_loop):
+    size = request.param
+    db_name = f"camplink_bench_{size}"
+    generator = DatasetGenerator(mongo[db_name], Namespace(
+        students=size, teams=size // 20, team_size=4, join_requests=size // 5,
+        events=10, rsvp_rate=0.2, competitions=5, notifications=size * 10,
+        messages=size * 2, photos=100, max_likes=50, leaves=size // 5, drop=True
+    ))
+    random.seed(size)
+    generator.run()
+    # Handlers are timed against the production indexes, so dropping one shows up as a regression
+    server.db = server.connect_db()[db_name]
+    bench_loop.run_until_complete(server.ensure_indexes())
+    yield Namespace(
+        size=size,
+        db_name=db_name,
+        students=generator.students,
+        teams=generator.teams,
+        free_students=[student for student in generator.students if not student["teams"]]
+    )
+    mongo.drop_database(db_name)
+
+@pytest.fixture
+def bench(request, dataset, baselines, bench_loop):
+    stored, results = baselines
+    rounds = request.config.getoption("--bench-rounds")
+    threshold = request.config.getoption("--regression-threshold")
+    server.db = server.connect_db()[dataset.db_name]
+
+    def run(name, make_call, warmup=2):
+        for _ in range(warmup):
+            bench_loop.run_until_complete(make_call())
+        timings = []
+        for _ in range(rounds):
+            # Cached loaders would otherwise answer from memory after the warmup and time nothing but the LRU
+            server.response_cache.entries.clear()
+            started = time.perf_counter()
+            bench_loop.run_until_complete(make_call())
+            timings.append((time.perf_counter() - started) * 1000)
+
+        key = f"{name}[{dataset.size}]"
+        median_ms = statistics.median(timings)
+        results[key] = {"median_ms": round(median_ms, 3), "max_ms": round(max(timings), 3), "rounds": rounds}
+        if request.config.getoption("--update-baselines"):
+            return median_ms
+        baseline = stored.get(key)
+        if baseline is None:
+            # A benchmark without a reference could never fail, so recording one must be explicit
+            pytest.fail(f"No reference baseline for {key}; record one with --update-baselines")
+        limit = baseline["median_ms"] * threshold
+        assert median_ms <= limit, (
+            f"{key} regressed: median {median_ms:.2f}ms vs baseline {baseline['median_ms']:.2f}ms "
+            f"(limit {limit:.2f}ms)"
+        )
+        return median_ms
+
+    return run
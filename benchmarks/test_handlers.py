@@ -0,0 +1,45 @@
+import itertools
+import random
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+import server
+from server import EventCreate, InterestRequirement, TeamCreate
+
+def plain_request():
+    # An unconditional GET, so ETag handling always falls through to the query
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+
+def test_get_teams(bench, dataset):
+    bench("get_teams", lambda: server.get_teams(plain_request(), Response()))
+
+def test_get_student_notifications(bench, dataset):
+    student = random.choice(dataset.students)
+    bench("get_student_notifications", lambda: server.get_student_notifications(student["id"]))
+
+def test_get_team_messages(bench, dataset):
+    team = random.choice(dataset.teams)
+    bench("get_team_messages", lambda: server.get_team_messages(team["id"], plain_request(), Response()))
+
+def test_admin_get_stats(bench, dataset):
+    bench("admin_get_stats", lambda: server.admin_get_stats())
+
+def test_create_team(bench, dataset):
+    # Leaders must not already be in a team, so each round takes a fresh student
+    leaders = iter(dataset.free_students)
+    counter = itertools.count()
+    bench("create_team", lambda: server.create_team(TeamCreate(
+        name=f"Bench Team {next(counter)}",
+        leaderId=next(leaders)["id"],
+        memberIds=[],
+        interests=["Backend"]
+    )))
+
+def test_create_event(bench, dataset):
+    counter = itertools.count()
+    bench("create_event", lambda: server.create_event(EventCreate(
+        name=f"Bench Event {next(counter)}",
+        description="Benchmark event",
+        interestRequirements=[InterestRequirement(interest="Backend", count=5)]
+    )))
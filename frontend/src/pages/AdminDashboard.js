@@ -13,6 +13,10 @@ import {
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Uploaded files and their renditions are served by the backend under /api/uploads
+const mediaUrl = (url) => (url?.startsWith('/api/') ? `${BACKEND_URL}${url}` : url);
+const LEAVE_STATUSES = ['pending', 'approved', 'rejected'];
+const BRANCHES = ['CSE', 'AI', 'CSD'];
 
 const AdminDashboard = ({ onLogout }) => {
   const navigate = useNavigate();
@@ -29,6 +33,7 @@ const AdminDashboard = ({ onLogout }) => {
   const [competitions, setCompetitions] = useState([]);
   const [photos, setPhotos] = useState([]);
   const [leaveApplications, setLeaveApplications] = useState([]);
+  const [leaveFilters, setLeaveFilters] = useState({ status: 'pending', branch: '' });
   const [showCreateEvent, setShowCreateEvent] = useState(false);
   const [showCreateCompetition, setShowCreateCompetition] = useState(false);
   const [showUploadPhoto, setShowUploadPhoto] = useState(false);
@@ -52,14 +57,34 @@ const AdminDashboard = ({ onLogout }) => {
     description: '',
     photoUrl: ''
   });
+  const [photoFile, setPhotoFile] = useState(null);
+  const [uploadingPhoto, setUploadingPhoto] = useState(false);
 
   useEffect(() => {
     fetchAllData();
   }, []);
 
+  useEffect(() => {
+    fetchLeaves();
+  }, [leaveFilters]);
+
+  // Leave applications are filtered on the server, so the dashboard never downloads the full history
+  const fetchLeaves = async () => {
+    const params = {};
+    if (leaveFilters.status) params.status = leaveFilters.status;
+    if (leaveFilters.branch) params.branch = leaveFilters.branch;
+    try {
+      const response = await axios.get(`${API}/admin/leave-applications`, { params });
+      setLeaveApplications(response.data);
+    } catch (error) {
+      console.error('Error fetching leave applications:', error);
+      toast.error('Failed to load leave applications');
+    }
+  };
+
   const fetchAllData = async () => {
     try {
-      const [studentsRes, teamsRes, interestsRes, requestsRes, statsRes, eventsRes, competitionsRes, photosRes, leavesRes] = await Promise.all([
+      const [studentsRes, teamsRes, interestsRes, requestsRes, statsRes, eventsRes, competitionsRes, photosRes] = await Promise.all([
         axios.get(`${API}/admin/students`),
         axios.get(`${API}/admin/teams`),
         axios.get(`${API}/interests`),
@@ -67,8 +92,7 @@ const AdminDashboard = ({ onLogout }) => {
         axios.get(`${API}/admin/stats`),
         axios.get(`${API}/events`),
         axios.get(`${API}/competitions`),
-        axios.get(`${API}/photos`),
-        axios.get(`${API}/admin/leave-applications`)
+        axios.get(`${API}/photos`)
       ]);
 
       setStudents(studentsRes.data);
@@ -79,7 +103,6 @@ const AdminDashboard = ({ onLogout }) => {
       setEvents(eventsRes.data);
       setCompetitions(competitionsRes.data);
       setPhotos(photosRes.data);
-      setLeaveApplications(leavesRes.data);
     } catch (error) {
       console.error('Error fetching admin data:', error);
       toast.error('Failed to load admin data');
@@ -96,6 +119,7 @@ const AdminDashboard = ({ onLogout }) => {
         comment
       });
       toast.success(`Leave ${action === 'approve' ? 'approved' : 'rejected'} successfully!`);
+      fetchLeaves();
       fetchAllData();
     } catch (error) {
       console.error('Error handling leave action:', error);
@@ -216,21 +240,33 @@ const AdminDashboard = ({ onLogout }) => {
 
   const handleUploadPhoto = async (e) => {
     e.preventDefault();
-    if (!newPhoto.eventName || !newPhoto.description || !newPhoto.photoUrl) {
-      toast.error('Please fill all fields');
+    if (!newPhoto.eventName || !newPhoto.description || (!photoFile && !newPhoto.photoUrl)) {
+      toast.error('Please fill all fields and choose a photo');
       return;
     }
 
+    setUploadingPhoto(true);
     try {
-      const response = await axios.post(`${API}/photos`, newPhoto);
+      let photoUrl = newPhoto.photoUrl;
+      // A chosen file is stored by the backend, which then renders the thumbnail the gallery grid loads
+      if (photoFile) {
+        const formData = new FormData();
+        formData.append('file', photoFile);
+        const upload = await axios.post(`${API}/uploads`, formData);
+        photoUrl = upload.data.url;
+      }
+      const response = await axios.post(`${API}/photos`, { ...newPhoto, photoUrl });
       setPhotos([response.data, ...photos]);
       setNewPhoto({ eventName: '', description: '', photoUrl: '' });
+      setPhotoFile(null);
       setShowUploadPhoto(false);
       toast.success('Photo uploaded successfully!');
       fetchAllData();
     } catch (error) {
       console.error('Error uploading photo:', error);
-      toast.error('Failed to upload photo');
+      toast.error(error.response?.data?.detail || 'Failed to upload photo');
+    } finally {
+      setUploadingPhoto(false);
     }
   };
 
@@ -358,14 +394,12 @@ const AdminDashboard = ({ onLogout }) => {
   const approvedRequests = requests.filter(r => r.status === 'approved');
   const rejectedRequests = requests.filter(r => r.status === 'rejected');
 
-  const pendingLeaves = leaveApplications.filter(l => l.status === 'pending');
-
   const sidebarItems = [
     { id: 'overview', label: 'Overview', icon: LayoutDashboard },
     { id: 'students', label: 'Students', icon: Users, count: students.length },
     { id: 'teams', label: 'Teams', icon: TrendingUp, count: teams.length },
     { id: 'requests', label: 'Requests', icon: UserCheck, count: pendingRequests.length },
-    { id: 'leaves', label: 'Leave Applications', icon: ClipboardList, count: pendingLeaves.length },
+    { id: 'leaves', label: 'Leave Applications', icon: ClipboardList, count: stats.pendingLeaves || 0 },
     { id: 'interests', label: 'Interests', icon: Heart, count: interests.length },
     { id: 'events', label: 'Events', icon: Calendar, count: events.length },
     { id: 'competitions', label: 'Competitions', icon: Trophy, count: competitions.length },
@@ -1252,13 +1286,41 @@ const AdminDashboard = ({ onLogout }) => {
                 {/* Leave Applications Tab */}
                 {activeTab === 'leaves' && (
                 <div className="space-y-6">
-                  <h2 className="text-2xl font-bold font-outfit text-slate-200">Leave Applications</h2>
+                  <div className="flex flex-wrap items-center justify-between gap-3">
+                    <h2 className="text-2xl font-bold font-outfit text-slate-200">Leave Applications</h2>
+                    <div className="flex flex-wrap gap-2">
+                      {['', ...LEAVE_STATUSES].map((status) => (
+                        <Button
+                          key={status || 'all-statuses'}
+                          data-testid={`leave-status-filter-${status || 'all'}`}
+                          size="sm"
+                          variant="ghost"
+                          onClick={() => setLeaveFilters({ ...leaveFilters, status })}
+                          className={leaveFilters.status === status ? 'bg-cyan-500/20 text-cyan-400' : 'text-slate-400'}
+                        >
+                          {status ? status.charAt(0).toUpperCase() + status.slice(1) : 'All'}
+                        </Button>
+                      ))}
+                      {['', ...BRANCHES].map((branch) => (
+                        <Button
+                          key={branch || 'all-branches'}
+                          data-testid={`leave-branch-filter-${branch || 'all'}`}
+                          size="sm"
+                          variant="ghost"
+                          onClick={() => setLeaveFilters({ ...leaveFilters, branch })}
+                          className={leaveFilters.branch === branch ? 'bg-cyan-500/20 text-cyan-400' : 'text-slate-400'}
+                        >
+                          {branch || 'All branches'}
+                        </Button>
+                      ))}
+                    </div>
+                  </div>
                   
                   <div className="space-y-4">
                     {leaveApplications.length === 0 ? (
                       <div className="glass-card rounded-xl p-12 text-center">
                         <ClipboardList className="w-16 h-16 text-slate-600 mx-auto mb-4" />
-                        <p className="text-slate-400">No leave applications yet</p>
+                        <p className="text-slate-400">No leave applications match these filters</p>
                       </div>
                     ) : (
                       leaveApplications.map((leave) => (
@@ -1376,16 +1438,27 @@ const AdminDashboard = ({ onLogout }) => {
                           />
                         </div>
                         <div>
-                          <label className="text-slate-300 text-sm mb-2 block">Photo URL*</label>
+                          <label className="text-slate-300 text-sm mb-2 block">Photo File*</label>
                           <Input
-                            data-testid="photo-url-input"
-                            placeholder="https://example.com/photo.jpg"
-                            value={newPhoto.photoUrl}
-                            onChange={(e) => setNewPhoto({...newPhoto, photoUrl: e.target.value})}
+                            data-testid="photo-file-input"
+                            type="file"
+                            accept="image/jpeg,image/png,image/webp,image/gif"
+                            onChange={(e) => setPhotoFile(e.target.files[0] || null)}
                             className="bg-slate-950/50 border-white/10 focus:border-cyan-500/50 text-slate-200"
                           />
                         </div>
                       </div>
+                      <div>
+                        <label className="text-slate-300 text-sm mb-2 block">Or Photo URL</label>
+                        <Input
+                          data-testid="photo-url-input"
+                          placeholder="https://example.com/photo.jpg"
+                          value={newPhoto.photoUrl}
+                          disabled={!!photoFile}
+                          onChange={(e) => setNewPhoto({...newPhoto, photoUrl: e.target.value})}
+                          className="bg-slate-950/50 border-white/10 focus:border-cyan-500/50 text-slate-200"
+                        />
+                      </div>
                       <div>
                         <label className="text-slate-300 text-sm mb-2 block">Description*</label>
                         <textarea
@@ -1400,9 +1473,10 @@ const AdminDashboard = ({ onLogout }) => {
                         <Button
                           data-testid="submit-photo-button"
                           type="submit"
+                          disabled={uploadingPhoto}
                           className="bg-cyan-500 text-black hover:bg-cyan-400 font-bold"
                         >
-                          Upload Photo
+                          {uploadingPhoto ? 'Uploading...' : 'Upload Photo'}
                         </Button>
                         <Button
                           type="button"
@@ -1431,7 +1505,7 @@ const AdminDashboard = ({ onLogout }) => {
                         >
                           <div className="relative">
                             <img
-                              src={photo.photoUrl}
+                              src={mediaUrl(photo.thumbnailUrl || photo.photoUrl)}
                               alt={photo.eventName}
                               className="w-full h-64 object-cover"
                               onError={(e) => {
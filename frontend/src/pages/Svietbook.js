@@ -7,6 +7,8 @@ import { ArrowLeft, Heart, Camera } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Uploaded files and their renditions are served by the backend under /api/uploads
+const mediaUrl = (url) => (url?.startsWith('/api/') ? `${BACKEND_URL}${url}` : url);
 
 const Svietbook = ({ student }) => {
   const navigate = useNavigate();
@@ -104,7 +106,7 @@ const Svietbook = ({ student }) => {
                 >
                   <div className="relative">
                     <img
-                      src={photo.photoUrl}
+                      src={mediaUrl(photo.thumbnailUrl || photo.photoUrl)}
                       alt={photo.eventName}
                       className="w-full h-72 object-cover"
                       onError={(e) => {
@@ -39,21 +39,19 @@ const TeamChat = ({ student }) => {
 
   const fetchTeamAndMessages = async () => {
     try {
-      const [teamsResponse, messagesResponse] = await Promise.all([
-        axios.get(`${API}/teams`),
+      const [teamResponse, messagesResponse] = await Promise.all([
+        axios.get(`${API}/teams/${teamId}`),
         axios.get(`${API}/teams/${teamId}/messages`)
       ]);
       
-      const foundTeam = teamsResponse.data.find(t => t.id === teamId);
-      if (!foundTeam) {
+      setTeam(teamResponse.data);
+      setMessages(messagesResponse.data);
+    } catch (error) {
+      if (error.response?.status === 404) {
         toast.error('Team not found');
         navigate('/dashboard');
         return;
       }
-      
-      setTeam(foundTeam);
-      setMessages(messagesResponse.data);
-    } catch (error) {
       console.error('Error fetching data:', error);
       toast.error('Failed to load team chat');
     } finally {
@@ -21,17 +21,14 @@ const TeamDetails = ({ student }) => {
 
   const fetchTeamDetails = async () => {
     try {
-      const response = await axios.get(`${API}/teams`);
-      const foundTeam = response.data.find(t => t.id === teamId);
-      
-      if (!foundTeam) {
+      const response = await axios.get(`${API}/teams/${teamId}`);
+      setTeam(response.data);
+    } catch (error) {
+      if (error.response?.status === 404) {
         toast.error('Team not found');
         navigate('/dashboard');
         return;
       }
-      
-      setTeam(foundTeam);
-    } catch (error) {
       console.error('Error fetching team details:', error);
       toast.error('Failed to load team details');
     } finally {
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+BRANCHES = {"CSE": "CS", "AI": "AI", "CSD": "CSD"}
+YEARS = ["2021", "2022", "2023", "2024", "2025"]
+INTERESTS = [
+    "Dance", "Singing", "Painting", "Poster Making",
+    "Web Development", "Backend", "C", "Java",
+    "Machine Learning", "Robotics", "Photography", "Debating",
+    "Cricket", "Football", "Music Production", "Cyber Security"
+]
+COLLECTIONS = [
+    "students", "interests", "teams", "teamRequests", "events", "competitions",
+    "notifications", "messages", "photos", "leaveApplications"
+]
+BATCH_SIZE = 10000
+
+class DatasetGenerator:
+    def __init__(self, db, args):
+        self.db = db
+        self.args = args
+        self.now = datetime.now(timezone.utc)
+        self.students = []
+        self.teams = []
+        self.events = []
+        self.competitions = []
+        self.leaves = []
+        self.unread_counts = {}
+        self.notification_counts = {}
+
+    def timestamp(self, max_days_ago=365):
+        """A createdAt within the last max_days_ago days, as the API stores it"""
+        return self.now - timedelta(seconds=random.randint(0, max_days_ago * 86400))
+
+    def insert(self, collection, documents):
+        """Insert in unordered batches so the server can apply them in parallel"""
+        started = time.perf_counter()
+        for offset in range(0, len(documents), BATCH_SIZE):
+            self.db[collection].insert_many(documents[offset:offset + BATCH_SIZE], ordered=False)
+        print(f"   {collection:<20} {len(documents):>10} docs in {time.perf_counter() - started:6.2f}s")
+
+    def insert_stream(self, collection, total, make_document):
+        """Insert generated documents batch by batch without holding them all in memory"""
+        started = time.perf_counter()
+        inserted = 0
+        while inserted < total:
+            batch = [make_document() for _ in range(min(BATCH_SIZE, total - inserted))]
+            self.db[collection].insert_many(batch, ordered=False)
+            inserted += len(batch)
+        print(f"   {collection:<20} {inserted:>10} docs in {time.perf_counter() - started:6.2f}s")
+
+    def build_students(self):
+        for index in range(self.args.students):
+            branch = list(BRANCHES)[index % len(BRANCHES)]
+            # Roll numbers only allow 3 serial digits, so overflow into the year prefix
+            serial = index // len(BRANCHES)
+            roll_year = 2000 + serial // 1000
+            self.students.append({
+                "id": str(uuid.uuid4()),
+                "name": f"Student {index}",
+                "branch": branch,
+                "year": random.choice(YEARS),
+                "rollNumber": f"{roll_year}BT{BRANCHES[branch]}{serial % 1000:03d}",
+                "interests": random.sample(INTERESTS, random.randint(0, 4)),
+                "teams": [],
+                "isLeader": False,
+                "unreadNotifications": 0,
+                "unreadCounted": True,
+                "notificationCount": 0,
+                "notificationsCounted": True,
+                "createdAt": self.timestamp()
+            })
+
+    def build_teams(self):
+        team_size = self.args.team_size
+        # Students belong to at most one team, so members are drawn without replacement
+        pool = random.sample(self.students, min(len(self.students), self.args.teams * team_size))
+        for index in range(min(self.args.teams, len(pool) // team_size)):
+            leader, *members = pool[index * team_size:(index + 1) * team_size]
+            team_id = str(uuid.uuid4())
+            leader["isLeader"] = True
+            for student in (leader, *members):
+                student["teams"] = [team_id]
+            self.teams.append({
+                "id": team_id,
+                "name": f"Team {index}",
+                "leaderId": leader["id"],
+                "leaderName": leader["name"],
+                "memberIds": [member["id"] for member in members],
+                "members": [{"id": member["id"], "name": member["name"]} for member in members],
+                "interests": random.sample(INTERESTS, random.randint(1, 3)),
+                "status": random.choices(["approved", "pending", "rejected"], [80, 15, 5])[0],
+                "createdAt": self.timestamp()
+            })
+
+    def join_requests(self):
+        requests = []
+        for _ in range(self.args.join_requests if self.teams else 0):
+            team = random.choice(self.teams)
+            student = random.choice(self.students)
+            requests.append({
+                "id": str(uuid.uuid4()),
+                "teamId": team["id"],
+                "teamName": team["name"],
+                "studentId": student["id"],
+                "studentName": student["name"],
+                "status": random.choices(["pending", "approved", "rejected"], [50, 35, 15])[0],
+                "createdAt": self.timestamp()
+            })
+        return requests
+
+    def build_events(self):
+        student_ids = [student["id"] for student in self.students]
+        for index in range(self.args.events):
+            responded = random.sample(student_ids, int(len(student_ids) * self.args.rsvp_rate))
+            split = int(len(responded) * random.uniform(0.4, 0.9))
+            self.events.append({
+                "id": str(uuid.uuid4()),
+                "name": f"Event {index}",
+                "description": f"Synthetic event {index}",
+                "interestRequirements": [
+                    {"interest": interest, "count": random.randint(2, 20)}
+                    for interest in random.sample(INTERESTS, random.randint(1, 3))
+                ],
+                "interestedStudents": responded[:split],
+                "notInterestedStudents": responded[split:],
+                "createdAt": self.timestamp()
+            })
+        for index in range(self.args.competitions):
+            self.competitions.append({
+                "id": str(uuid.uuid4()),
+                "name": f"Competition {index}",
+                "description": f"Synthetic competition {index}",
+                "skillsRequired": ", ".join(random.sample(INTERESTS, 2)),
+                "rules": "Standard rules apply",
+                "eventDate": (self.now + timedelta(days=random.randint(1, 90))).date().isoformat(),
+                "createdAt": self.timestamp()
+            })
+
+    def build_leaves(self):
+        for _ in range(self.args.leaves):
+            student = random.choice(self.students)
+            start = datetime.combine(self.now.date(), datetime.min.time(), timezone.utc) - timedelta(days=random.randint(-30, 365))
+            status = random.choices(["pending", "approved", "rejected"], [30, 55, 15])[0]
+            self.leaves.append({
+                "id": str(uuid.uuid4()),
+                "studentId": student["id"],
+                "studentName": student["name"],
+                "studentRollNumber": student["rollNumber"],
+                "studentBranch": student["branch"],
+                "reason": random.choice(["Medical", "Family function", "Competition travel", "Personal"]),
+                "fromDate": start,
+                "toDate": start + timedelta(days=random.randint(0, 6)),
+                "documentUrl": None,
+                "status": status,
+                "adminComment": None if status == "pending" else "Reviewed",
+                "createdAt": self.timestamp()
+            })
+
+    def notification(self):
+        student = random.choice(self.students)
+        kind = random.choices(["event", "competition", "leave"], [60, 30, 10])[0]
+        related = {
+            "event": self.events, "competition": self.competitions, "leave": self.leaves
+        }[kind]
+        is_read = random.random() < 0.6
+        self.notification_counts[student["id"]] = self.notification_counts.get(student["id"], 0) + 1
+        if not is_read:
+            self.unread_counts[student["id"]] = self.unread_counts.get(student["id"], 0) + 1
+        return {
+            "id": str(uuid.uuid4()),
+            "studentId": student["id"],
+            "title": f"New {kind.title()} Update",
+            "message": f"Synthetic {kind} notification",
+            "type": kind,
+            "relatedId": random.choice(related)["id"] if related else "",
+            "isRead": is_read,
+            "createdAt": self.timestamp()
+        }
+
+    def update_unread_counters(self):
+        """Match the students' denormalized notification counters to the generated notifications"""
+        operations = [
+            UpdateOne({"id": student_id}, {"$set": {
+                "unreadNotifications": self.unread_counts.get(student_id, 0),
+                "notificationCount": count
+            }})
+            for student_id, count in self.notification_counts.items()
+        ]
+        for offset in range(0, len(operations), BATCH_SIZE):
+            self.db.students.bulk_write(operations[offset:offset + BATCH_SIZE], ordered=False)
+
+    def message(self):
+        team = random.choice(self.teams)
+        author = random.choice([team["leaderId"], *team["memberIds"]])
+        return {
+            "id": str(uuid.uuid4()),
+            "teamId": team["id"],
+            "studentId": author,
+            "studentName": f"Member of {team['name']}",
+            "message": random.choice(["hi", "meeting at 5?", "pushed the fix", "see the doc", "👍"]),
+            "createdAt": self.timestamp(90)
+        }
+
+    def photos(self):
+        student_ids = [student["id"] for student in self.students]
+        return [{
+            "id": str(uuid.uuid4()),
+            "eventName": random.choice(self.events)["name"] if self.events else "Campus",
+            "description": f"Synthetic photo {index}",
+            "photoUrl": f"https://picsum.photos/seed/{index}/1200/800",
+            "likes": random.sample(student_ids, min(len(student_ids), random.randint(0, self.args.max_likes))),
+            "uploadedBy": "admin",
+            "createdAt": self.timestamp()
+        } for index in range(self.args.photos)]
+
+    def run(self):
+        started = time.perf_counter()
+        if self.args.drop:
+            for collection in COLLECTIONS:
+                self.db[collection].drop()
+
+        print("🏗️  Building students, teams, events and leaves...")
+        self.build_students()
+        self.build_teams()
+        self.build_events()
+        self.build_leaves()
+
+        print("📥 Inserting...")
+        existing_interests = set(self.db.interests.distinct("name"))
+        self.insert("interests", [
+            {"id": str(uuid.uuid4()), "name": name, "createdAt": self.timestamp()}
+            for name in INTERESTS if name not in existing_interests
+        ])
+        self.insert("students", self.students)
+        self.insert("teams", self.teams)
+        self.insert("teamRequests", self.join_requests())
+        self.insert("events", self.events)
+        self.insert("competitions", self.competitions)
+        self.insert("leaveApplications", self.leaves)
+        self.insert("photos", self.photos())
+        if self.students:
+            self.insert_stream("notifications", self.args.notifications, self.notification)
+            self.update_unread_counters()
+        if self.teams:
+            self.insert_stream("messages", self.args.messages, self.message)
+
+        print(f"\n✅ Dataset generated in {time.perf_counter() - started:.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a local database with a synthetic campus dataset")
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--teams", type=int, default=5000)
+    parser.add_argument("--team-size", type=int, default=4)
+    parser.add_argument("--join-requests", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--rsvp-rate", type=float, default=0.2, help="Fraction of students responding to each event")
+    parser.add_argument("--competitions", type=int, default=20)
+    parser.add_argument("--notifications", type=int, default=1000000)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--photos", type=int, default=2000)
+    parser.add_argument("--max-likes", type=int, default=200)
+    parser.add_argument("--leaves", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--drop", action="store_true", help="Drop the generated collections first")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    load_dotenv(Path(__file__).parent / "backend" / ".env")
+    client = MongoClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[os.environ.get("DB_NAME", "camplink_scale")]
+    print(f"🎯 Target database: {db.name}")
+
+    DatasetGenerator(db, args).run()
+    client.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BRANCH_CODES = {"CSE": "CS", "AI": "AI", "CSD": "CSD"}
+# 429 from the rate limits and 503 from admission control
+SHED_STATUSES = (429, 503)
+PREPARE_ATTEMPTS = 5
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+        self.shed = 0
+
+    def record(self, latency, status_code):
+        self.latencies.append(latency)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        # Rate limited and load shed requests return quickly, so they would flatter the latencies if left uncounted
+        if status_code in SHED_STATUSES:
+            self.shed += 1
+        elif status_code >= 500:
+            self.errors += 1
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class LoadTester:
+    def __init__(self, client, concurrency=50, duration=30.0, students=200):
+        self.client = client
+        self.concurrency = concurrency
+        self.duration = duration
+        self.student_count = students
+        self.stats = {}
+        self.roll_counter = 0
+        self.students = []
+        self.team_ids = []
+        self.elapsed = 0.0
+
+    async def call(self, route, method, url, **kwargs):
+        """Issue one request and record its latency under the route template"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status_code = response.status_code
+        except httpx.HTTPError:
+            response = None
+            status_code = 599
+        latency = time.perf_counter() - started
+        self.stats.setdefault(route, RouteStats()).record(latency, status_code)
+        return response
+
+    def next_roll_number(self, branch):
+        self.roll_counter += 1
+        year = 2000 + (self.roll_counter // 1000) % 100
+        return f"{year}BT{BRANCH_CODES[branch]}{self.roll_counter % 1000:03d}"
+
+    def new_student(self, branch=None):
+        branch = branch or random.choice(list(BRANCH_CODES))
+        return {
+            "name": f"Load Student {self.roll_counter}",
+            "branch": branch,
+            "year": str(random.randint(1, 4)),
+            "rollNumber": self.next_roll_number(branch)
+        }
+
+    async def login(self, branch=None):
+        response = await self.call("POST /api/auth/student", "POST", "/api/auth/student", json=self.new_student(branch))
+        if response is not None and response.status_code == 200:
+            return response.json()
+        return None
+
+    async def prepare_student(self):
+        """Log in one setup student, waiting out any rate limit or load shedding on the way"""
+        payload = self.new_student()
+        for _ in range(PREPARE_ATTEMPTS):
+            response = await self.client.post("/api/auth/student", json=payload)
+            if response.status_code not in SHED_STATUSES:
+                break
+            await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+        return response.json() if response.status_code == 200 else None
+
+    async def prepare(self):
+        """Create the students and approved teams the scenarios operate on"""
+        print(f"🔧 Preparing {self.student_count} students...")
+        for _ in range(self.student_count):
+            student = await self.prepare_student()
+            if student:
+                self.students.append(student)
+
+        leaders = self.students[:max(1, len(self.students) // 20)]
+        for index, leader in enumerate(leaders):
+            response = await self.client.post("/api/teams", json={
+                "name": f"Load Team {index} {random.randint(0, 10**9)}",
+                "leaderId": leader["id"],
+                "memberIds": [],
+                "interests": ["Backend"]
+            })
+            if response.status_code == 200:
+                team_id = response.json()["id"]
+                await self.client.post(f"/api/admin/teams/{team_id}/approve")
+                self.team_ids.append(team_id)
+        print(f"   {len(self.students)} students, {len(self.team_ids)} teams ready")
+
+    async def login_storm(self):
+        """A returning or first-time student logs in and loads the dashboard"""
+        if self.students and random.random() < 0.7:
+            known = random.choice(self.students)
+            response = await self.call("POST /api/auth/student", "POST", "/api/auth/student", json={
+                "name": known["name"],
+                "branch": known["branch"],
+                "year": known["year"],
+                "rollNumber": known["rollNumber"]
+            })
+            student = response.json() if response is not None and response.status_code == 200 else None
+        else:
+            student = await self.login()
+        if not student:
+            return
+        await self.call("GET /api/notifications/{student_id}/unread-count", "GET",
+                        f"/api/notifications/{student['id']}/unread-count")
+        await self.call("GET /api/interests", "GET", "/api/interests")
+        await self.call("GET /api/events", "GET", "/api/events")
+
+    async def chat_polling(self):
+        """A team member polls the chat and occasionally posts"""
+        if not self.team_ids:
+            return
+        team_id = random.choice(self.team_ids)
+        await self.call("GET /api/teams/{team_id}/messages", "GET", f"/api/teams/{team_id}/messages")
+        if random.random() < 0.1:
+            student = random.choice(self.students)
+            await self.call("POST /api/teams/{team_id}/messages", "POST", f"/api/teams/{team_id}/messages", json={
+                "teamId": team_id,
+                "studentId": student["id"],
+                "studentName": student["name"],
+                "message": "load test message"
+            })
+
+    async def admin_dashboard(self):
+        """The admin dashboard loads all of its panels"""
+        await self.call("GET /api/admin/stats", "GET", "/api/admin/stats")
+        await self.call("GET /api/admin/students", "GET", "/api/admin/students")
+        await self.call("GET /api/admin/teams", "GET", "/api/admin/teams")
+        await self.call("GET /api/admin/requests", "GET", "/api/admin/requests")
+        await self.call("GET /api/admin/leave-applications", "GET", "/api/admin/leave-applications")
+
+    async def join_approvals(self):
+        """A new student asks to join a team and the leader approves"""
+        if not self.team_ids:
+            return
+        student = await self.login()
+        if not student:
+            return
+        response = await self.call("POST /api/team-requests", "POST", "/api/team-requests", json={
+            "teamId": random.choice(self.team_ids),
+            "studentId": student["id"]
+        })
+        if response is None or response.status_code != 200:
+            return
+        await self.call("POST /api/team-requests/action", "POST", "/api/team-requests/action", json={
+            "requestId": response.json()["id"],
+            "action": "approve"
+        })
+
+    SCENARIOS = {
+        "login_storm": {"login_storm": 1},
+        "chat_polling": {"chat_polling": 1},
+        "admin_dashboard": {"admin_dashboard": 1},
+        "join_approvals": {"join_approvals": 1},
+        "mixed": {"login_storm": 4, "chat_polling": 4, "admin_dashboard": 1, "join_approvals": 1},
+    }
+
+    async def virtual_user(self, mix, deadline):
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            await getattr(self, random.choices(names, weights)[0])()
+
+    async def run(self, scenario):
+        await self.prepare()
+        print(f"🚀 Running '{scenario}' with {self.concurrency} concurrent users for {self.duration:.0f}s...")
+        self.stats = {}
+        started = time.perf_counter()
+        deadline = started + self.duration
+        mix = self.SCENARIOS[scenario]
+        await asyncio.gather(*(self.virtual_user(mix, deadline) for _ in range(self.concurrency)))
+        self.elapsed = time.perf_counter() - started
+        return self.report()
+
+    def report(self):
+        routes = {}
+        for route, stats in sorted(self.stats.items()):
+            latencies = sorted(stats.latencies)
+            routes[route] = {
+                "requests": len(latencies),
+                "rps": len(latencies) / self.elapsed if self.elapsed else 0.0,
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "errors": stats.errors,
+                "shed": stats.shed,
+                "statuses": {str(code): count for code, count in sorted(stats.statuses.items())}
+            }
+        total = sum(route["requests"] for route in routes.values())
+
+        print(f"\n📊 {total} requests in {self.elapsed:.1f}s ({total / self.elapsed:.1f} req/s)")
+        print(f"{'route':<55} {'req':>7} {'rps':>8} {'p50ms':>8} {'p95ms':>8} {'p99ms':>8} {'5xx':>5} {'shed':>5}")
+        for route, row in routes.items():
+            print(f"{route:<55} {row['requests']:>7} {row['rps']:>8.1f} {row['p50_ms']:>8.1f} "
+                  f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['errors']:>5} {row['shed']:>5}")
+
+        return {
+            "concurrency": self.concurrency,
+            "duration_seconds": self.elapsed,
+            "total_requests": total,
+            "rps": total / self.elapsed if self.elapsed else 0.0,
+            "routes": routes
+        }
+
+async def run_load_test(args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.in_process:
+        # Import the app only here so a remote run needs no backend environment
+        sys.path.insert(0, str(Path(__file__).parent / "backend"))
+        # Virtual users share one client address and keep logging the same students in, which the rate limits would throttle
+        os.environ.setdefault("RATE_LIMITS_ENABLED", "false")
+        from server import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as client:
+                return await LoadTester(client, args.concurrency, args.duration, args.students).run(args.scenario)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        return await LoadTester(client, args.concurrency, args.duration, args.students).run(args.scenario)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay realistic traffic mixes against the backend")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Serve backend/server.py in this process (uses MONGO_URL/DB_NAME, point them at a local mongod)")
+    parser.add_argument("--scenario", choices=sorted(LoadTester.SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--output", default="load_test_results.json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load_test(args))
+    results["scenario"] = args.scenario
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    # Shed requests mean the run measured the limits rather than the backend, so they fail it too
+    return 0 if all(route["errors"] == 0 and route["shed"] == 0 for route in results["routes"].values()) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+# server.py reads these at import; the pure helpers under test never open a connection
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "camplink_test")
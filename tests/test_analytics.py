@@ -0,0 +1,47 @@
+from server import ANALYTICS_VIEWS, changed_partitions
+
+STUDENTS = ANALYTICS_VIEWS["interestPopularity"]
+TEAMS = ANALYTICS_VIEWS["teamInterests"]
+EVENTS = ANALYTICS_VIEWS["eventRsvp"]
+
+def update(document, updated=None, removed=None):
+    return {
+        "operationType": "update",
+        "fullDocument": document,
+        "updateDescription": {"updatedFields": updated or {}, "removedFields": removed or []}
+    }
+
+def test_insert_dirties_the_new_documents_partition():
+    change = {"operationType": "insert", "fullDocument": {"id": "s1", "branch": "CSE", "year": "2"}}
+    assert changed_partitions(STUDENTS, change) == [("CSE", "2")]
+
+def test_update_dirties_the_documents_partition():
+    change = update({"id": "s1", "branch": "AI", "year": "1", "interests": ["Web"]}, updated={"interests": ["Web"]})
+    assert changed_partitions(STUDENTS, change) == [("AI", "1")]
+
+def test_team_update_dirties_every_interest_it_carries():
+    change = update({"id": "t1", "interests": ["Web", "ML"], "status": "approved"}, updated={"status": "approved"})
+    assert changed_partitions(TEAMS, change) == ["Web", "ML"]
+
+def test_event_update_dirties_only_that_event():
+    change = update({"id": "e1", "interestedStudents": ["s1"]}, updated={"interestedStudents": ["s1"]})
+    assert changed_partitions(EVENTS, change) == ["e1"]
+
+def test_moving_a_document_needs_a_rebuild():
+    change = update({"id": "s1", "branch": "AI", "year": "1"}, updated={"branch": "AI"})
+    assert changed_partitions(STUDENTS, change) is None
+
+def test_changing_a_partition_field_by_path_needs_a_rebuild():
+    change = update({"id": "t1", "interests": ["ML"]}, updated={"interests.0": "ML"})
+    assert changed_partitions(TEAMS, change) is None
+
+def test_removing_a_partition_field_needs_a_rebuild():
+    change = update({"id": "s1", "branch": "AI"}, removed=["year"])
+    assert changed_partitions(STUDENTS, change) is None
+
+def test_delete_needs_a_rebuild():
+    assert changed_partitions(STUDENTS, {"operationType": "delete", "documentKey": {"_id": 1}}) is None
+
+def test_update_of_a_since_deleted_document_needs_a_rebuild():
+    change = update(None, updated={"interests": []})
+    assert changed_partitions(STUDENTS, change) is None
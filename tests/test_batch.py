@@ -0,0 +1,42 @@
+from server import TeamAction, batch_response, split_batch
+
+def test_split_batch_keeps_found_items_with_valid_actions():
+    items = [TeamAction(teamId="t1", action="approve"), TeamAction(teamId="t2", action="reject")]
+    valid, results = split_batch(items, "teamId", {"t1", "t2"}, "Team not found")
+    assert valid == items
+    assert results == {
+        "t1": {"id": "t1", "success": True, "status": "approved"},
+        "t2": {"id": "t2", "success": True, "status": "rejected"},
+    }
+
+def test_split_batch_reports_missing_ids_and_invalid_actions():
+    items = [TeamAction(teamId="gone", action="approve"), TeamAction(teamId="t1", action="archive")]
+    valid, results = split_batch(items, "teamId", {"t1"}, "Team not found")
+    assert valid == []
+    assert results["gone"] == {"id": "gone", "success": False, "detail": "Team not found"}
+    assert results["t1"] == {"id": "t1", "success": False, "detail": "Invalid action"}
+
+def test_split_batch_fails_a_repeated_id_as_a_whole():
+    items = [
+        TeamAction(teamId="t1", action="approve"),
+        TeamAction(teamId="t2", action="approve"),
+        TeamAction(teamId="t1", action="reject"),
+    ]
+    valid, results = split_batch(items, "teamId", {"t1", "t2"}, "Team not found")
+    # The first t1 was accepted before the repeat was seen, and must be dropped with it
+    assert [item.teamId for item in valid] == ["t2"]
+    assert results["t1"] == {"id": "t1", "success": False, "detail": "Duplicate item in batch"}
+
+def test_batch_response_counts_outcomes():
+    results = {
+        "a": {"id": "a", "success": True, "status": "approved"},
+        "b": {"id": "b", "success": False, "detail": "Team not found"},
+        "c": {"id": "c", "success": True, "status": "rejected"},
+    }
+    response = batch_response(results)
+    assert response["succeeded"] == 2
+    assert response["failed"] == 1
+    assert [r["id"] for r in response["results"]] == ["a", "b", "c"]
+
+def test_batch_response_of_an_empty_batch():
+    assert batch_response({}) == {"results": [], "succeeded": 0, "failed": 0}
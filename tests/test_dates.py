@@ -0,0 +1,85 @@
+from datetime import date, datetime, timezone
+
+from pymongo import UpdateOne
+
+from server import as_datetime, created_range, date_conversion, leave_overlap, mixed_date_pipeline
+
+def test_as_datetime_parses_iso_strings():
+    assert as_datetime("2024-03-05T10:30:00+00:00") == datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)
+
+def test_as_datetime_treats_naive_values_as_utc():
+    assert as_datetime("2024-03-05T10:30:00") == datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)
+    assert as_datetime(datetime(2024, 3, 5, 10, 30)).tzinfo == timezone.utc
+
+def test_as_datetime_keeps_other_offsets():
+    value = as_datetime("2024-03-05T16:00:00+05:30")
+    assert value == datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)
+
+def test_as_datetime_promotes_dates_to_midnight():
+    assert as_datetime(date(2024, 3, 5)) == datetime(2024, 3, 5, tzinfo=timezone.utc)
+
+def test_created_range():
+    after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    before = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert created_range(None, None) == {}
+    assert created_range(after, None) == {"createdAt": {"$gte": after}}
+    assert created_range(after, before) == {"createdAt": {"$gte": after, "$lt": before}}
+
+def test_date_conversion_converts_strings_and_guards_on_old_values():
+    doc = {"_id": 1, "createdAt": "2024-03-05T10:30:00+00:00", "fromDate": datetime(2024, 3, 6, tzinfo=timezone.utc)}
+    operation = date_conversion(doc, ["createdAt", "fromDate"])
+    assert operation == UpdateOne(
+        {"_id": 1, "createdAt": "2024-03-05T10:30:00+00:00"},
+        {"$set": {"createdAt": datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)}}
+    )
+
+def test_date_conversion_inside_arrays():
+    messages = [
+        {"id": "m1", "createdAt": "2024-03-05T10:30:00+00:00"},
+        {"id": "m2", "createdAt": datetime(2024, 3, 5, 11, tzinfo=timezone.utc)},
+    ]
+    operation = date_conversion({"_id": 1, "messages": messages}, ["messages.createdAt"])
+    assert operation == UpdateOne({"_id": 1, "messages": messages}, {"$set": {"messages": [
+        {"id": "m1", "createdAt": datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)},
+        messages[1],
+    ]}})
+
+def test_mixed_date_pipeline_filters_ranges_on_converted_dates():
+    after = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    query = {"teamId": "t1", **created_range(after, None)}
+    pipeline = mixed_date_pipeline("messages", query, {"_id": 0}, "createdAt", 1, limit=50)
+    # A string createdAt would never match the range, so only the other filters run before the conversion
+    assert pipeline[0] == {"$match": {"teamId": "t1"}}
+    assert pipeline[1] == {"$addFields": {
+        "_createdAtDate": {"$convert": {"input": "$createdAt", "to": "date", "onError": None}}
+    }}
+    assert pipeline[2] == {"$match": {"_createdAtDate": {"$gte": after}}}
+    assert pipeline[3:] == [
+        {"$sort": {"_createdAtDate": 1}},
+        {"$unset": ["_createdAtDate"]},
+        {"$project": {"_id": 0}},
+        {"$limit": 50}
+    ]
+
+def test_mixed_date_pipeline_without_a_range_only_sorts_on_the_converted_date():
+    pipeline = mixed_date_pipeline("photos", {}, {"_id": 0}, "createdAt", -1)
+    assert [next(iter(stage)) for stage in pipeline] == ["$match", "$addFields", "$sort", "$unset", "$project"]
+    assert pipeline[2] == {"$sort": {"_createdAtDate": -1}}
+
+def test_leave_overlap():
+    start, end = date(2024, 5, 4), date(2024, 5, 10)
+    assert leave_overlap(None, None) == {}
+    assert leave_overlap(start, end) == {
+        "fromDate": {"$lte": datetime(2024, 5, 10, tzinfo=timezone.utc)},
+        "toDate": {"$gte": datetime(2024, 5, 4, tzinfo=timezone.utc)}
+    }
+
+def test_mixed_date_pipeline_matches_leave_overlap_on_converted_dates():
+    query = {"status": "pending", **leave_overlap(date(2024, 5, 4), date(2024, 5, 10))}
+    pipeline = mixed_date_pipeline("leaveApplications", query, {"_id": 0}, "createdAt", -1)
+    assert pipeline[0] == {"$match": {"status": "pending"}}
+    assert set(pipeline[1]["$addFields"]) == {"_createdAtDate", "_fromDateDate", "_toDateDate"}
+    assert pipeline[2] == {"$match": {
+        "_fromDateDate": {"$lte": datetime(2024, 5, 10, tzinfo=timezone.utc)},
+        "_toDateDate": {"$gte": datetime(2024, 5, 4, tzinfo=timezone.utc)}
+    }}
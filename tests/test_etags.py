@@ -0,0 +1,25 @@
+from server import etag_matches
+
+ETAG = '"a1b2c3d4.7"'
+
+def test_no_header_never_matches():
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches("", ETAG)
+
+def test_exact_tag_matches():
+    assert etag_matches(ETAG, ETAG)
+
+def test_other_tag_does_not_match():
+    assert not etag_matches('"a1b2c3d4.6"', ETAG)
+
+def test_any_tag_in_a_list_matches():
+    assert etag_matches(f'"stale.1", {ETAG} , "other.2"', ETAG)
+
+def test_weak_tag_matches_its_strong_form():
+    assert etag_matches(f"W/{ETAG}", ETAG)
+
+def test_wildcard_matches():
+    assert etag_matches("*", ETAG)
+
+def test_unquoted_tag_does_not_match():
+    assert not etag_matches("a1b2c3d4.7", ETAG)
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from server import AdmissionController, TokenBucketLimiter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+def test_bucket_allows_a_burst_up_to_capacity(clock):
+    limiter = TokenBucketLimiter(3, 60)
+    assert [limiter.take("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("a") == pytest.approx(20.0)
+
+def test_bucket_refills_over_time(clock):
+    limiter = TokenBucketLimiter(2, 10)
+    limiter.take("a")
+    limiter.take("a")
+    clock.now += 5
+    assert limiter.take("a") == 0
+    assert limiter.take("a") == pytest.approx(5.0)
+
+def test_buckets_are_per_key(clock):
+    limiter = TokenBucketLimiter(1, 60)
+    assert limiter.take("a") == 0
+    assert limiter.take("b") == 0
+    assert limiter.take("a") > 0
+
+def test_least_recently_used_keys_are_evicted(clock, monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMIT_MAX_CLIENTS", 2)
+    limiter = TokenBucketLimiter(1, 60)
+    for key in ("a", "b", "c"):
+        limiter.take(key)
+    assert list(limiter.buckets) == ["b", "c"]
+    # An evicted client starts again with a full bucket
+    assert limiter.take("a") == 0
+
+def test_rate_limit_setting_parses_and_disables(monkeypatch):
+    monkeypatch.setattr(server, "RATE_LIMITS_ENABLED", True)
+    monkeypatch.setenv("RATE_LIMIT_TEST", "5/30")
+    limiter = server.rate_limit_setting("TEST", "off")
+    assert (limiter.capacity, limiter.refill_per_second) == (5, pytest.approx(5 / 30))
+    monkeypatch.setenv("RATE_LIMIT_TEST", "off")
+    assert server.rate_limit_setting("TEST", "5/30") is None
+
+def test_admission_runs_up_to_the_limit_at_once():
+    async def scenario():
+        controller = AdmissionController(2, 1.0)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with controller.admit("test"):
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request() for _ in range(6)))
+        return controller, peak
+
+    controller, peak = asyncio.run(scenario())
+    assert peak == 2
+    assert (controller.in_flight, controller.queued) == (0, 0)
+
+def test_admission_sheds_after_the_queue_timeout(monkeypatch):
+    monkeypatch.setattr(server, "shed_requests", {})
+
+    async def scenario():
+        controller = AdmissionController(1, 0.01)
+        async with controller.admit("test"):
+            with pytest.raises(HTTPException) as exc:
+                async with controller.admit("test"):
+                    pass
+        return controller, exc.value
+
+    controller, error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert "Retry-After" in error.headers
+    assert server.shed_requests == {("test", "overloaded"): 1}
+    assert (controller.in_flight, controller.queued) == (0, 0)
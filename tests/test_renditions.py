@@ -0,0 +1,34 @@
+import io
+
+import pytest
+from PIL import Image
+
+from renditions import render_renditions
+
+SIZES = {"thumbnail": 64}
+
+def jpeg(width=200, height=100):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(output, "JPEG")
+    return output.getvalue()
+
+def test_renders_each_size_within_its_longest_side():
+    renditions = render_renditions(jpeg(), SIZES)
+    with Image.open(io.BytesIO(renditions["thumbnail"])) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (64, 32)
+
+def test_truncated_image_is_not_renderable():
+    data = jpeg()
+    with pytest.raises(ValueError, match="Not a renderable image"):
+        render_renditions(data[:len(data) // 2], SIZES)
+
+def test_unidentifiable_file_is_not_renderable():
+    with pytest.raises(ValueError, match="Not a renderable image"):
+        render_renditions(b"%PDF-1.7 not an image", SIZES)
+
+def test_decompression_bomb_is_not_renderable(monkeypatch):
+    # Pillow raises once an image is more than twice the pixel limit
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(ValueError, match="Not a renderable image"):
+        render_renditions(jpeg(), SIZES)
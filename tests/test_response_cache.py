@@ -0,0 +1,164 @@
+import asyncio
+
+import pytest
+
+import server
+from server import ResponseCache, cached_response
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(server, "response_cache", ResponseCache(100, 60))
+    monkeypatch.setattr(server, "known_versions", {"widgets": ("a", 1)})
+    monkeypatch.setattr(server, "in_flight_loads", {})
+    monkeypatch.setattr(server, "coalesced_requests", {})
+
+def test_cache_returns_what_was_put(clock):
+    cache = ResponseCache(10, 60)
+    assert cache.get("k", (1,)) is None
+    cache.put("k", (1,), "value")
+    assert cache.get("k", (1,)) == "value"
+
+def test_cache_drops_entries_from_other_versions(clock):
+    cache = ResponseCache(10, 60)
+    cache.put("k", (1,), "value")
+    assert cache.get("k", (2,)) is None
+    assert "k" not in cache.entries
+
+def test_cache_expires_entries_after_the_ttl(clock):
+    cache = ResponseCache(10, 60)
+    cache.put("k", (1,), "value")
+    clock.now += 59
+    assert cache.get("k", (1,)) == "value"
+    clock.now += 2
+    assert cache.get("k", (1,)) is None
+    assert "k" not in cache.entries
+
+def test_cache_evicts_the_least_recently_used(clock):
+    cache = ResponseCache(2, 60)
+    cache.put("a", (1,), 1)
+    cache.put("b", (1,), 2)
+    # Reading a makes b the oldest
+    cache.get("a", (1,))
+    cache.put("c", (1,), 3)
+    assert list(cache.entries) == ["a", "c"]
+
+def test_concurrent_misses_share_one_load(fresh_cache):
+    calls = 0
+
+    @cached_response("widgets", coalesce=True)
+    async def load_widgets():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["widget"]
+
+    async def scenario():
+        return await asyncio.gather(*(load_widgets() for _ in range(5)))
+
+    assert asyncio.run(scenario()) == [["widget"]] * 5
+    assert calls == 1
+    assert server.coalesced_requests == {"load_widgets": 4}
+    assert server.in_flight_loads == {}
+
+def test_waiters_see_the_leaders_failure_and_the_next_call_retries(fresh_cache):
+    calls = 0
+
+    @cached_response("widgets", coalesce=True)
+    async def load_widgets():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise RuntimeError("database unavailable")
+        return ["widget"]
+
+    async def scenario():
+        results = await asyncio.gather(*(load_widgets() for _ in range(3)), return_exceptions=True)
+        # The failed flight is gone, so this starts a new load instead of joining the old one
+        assert server.in_flight_loads == {}
+        return results, await load_widgets()
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == ["widget"]
+    assert calls == 2
+
+def test_a_read_after_a_version_bump_does_not_join_the_older_load(fresh_cache):
+    calls = 0
+    release = None
+
+    @cached_response("widgets", coalesce=True)
+    async def load_widgets():
+        nonlocal calls
+        calls += 1
+        version = calls
+        if version == 1:
+            await release.wait()
+        return version
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        before = asyncio.ensure_future(load_widgets())
+        await asyncio.sleep(0)
+        server.known_versions["widgets"] = ("a", 2)
+        after = await load_widgets()
+        release.set()
+        return await before, after, await load_widgets()
+
+    before, after, latest = asyncio.run(scenario())
+    assert (before, after) == (1, 2)
+    # The older load finished last but was stamped with the old version, so it is reloaded rather than served
+    assert latest == 3
+
+def test_a_cancelled_waiter_does_not_cancel_the_shared_load(fresh_cache):
+    calls = 0
+
+    @cached_response("widgets", coalesce=True)
+    async def load_widgets():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.02)
+        return ["widget"]
+
+    async def scenario():
+        first = asyncio.ensure_future(load_widgets())
+        second = asyncio.ensure_future(load_widgets())
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == ["widget"]
+    assert calls == 1
+
+def test_uncoalesced_loaders_load_for_every_miss(fresh_cache):
+    calls = 0
+
+    @cached_response("widgets")
+    async def load_widgets():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["widget"]
+
+    async def scenario():
+        await asyncio.gather(load_widgets(), load_widgets())
+        # Once filled, the entry answers without loading
+        return await load_widgets()
+
+    assert asyncio.run(scenario()) == ["widget"]
+    assert calls == 2
+    assert server.response_cache.hits == 1
@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+
+from server import parse_byte_range
+
+LENGTH = 1000
+
+def test_closed_range():
+    assert parse_byte_range("bytes=0-99", LENGTH) == (0, 99)
+
+def test_open_ended_range_runs_to_the_end():
+    assert parse_byte_range("bytes=500-", LENGTH) == (500, 999)
+
+def test_suffix_range_takes_the_last_bytes():
+    assert parse_byte_range("bytes=-100", LENGTH) == (900, 999)
+
+def test_suffix_longer_than_the_file_starts_at_zero():
+    assert parse_byte_range("bytes=-5000", LENGTH) == (0, 999)
+
+def test_end_is_clamped_to_the_file():
+    assert parse_byte_range("bytes=900-5000", LENGTH) == (900, 999)
+
+def test_start_past_the_end_is_not_satisfiable():
+    with pytest.raises(HTTPException) as exc:
+        parse_byte_range("bytes=1000-", LENGTH)
+    assert exc.value.status_code == 416
+    assert exc.value.headers["Content-Range"] == f"bytes */{LENGTH}"
+
+def test_unsupported_ranges_fall_back_to_the_whole_file():
+    assert parse_byte_range("items=0-99", LENGTH) is None
+    assert parse_byte_range("bytes=0-99,200-299", LENGTH) is None
+    assert parse_byte_range("bytes=abc-def", LENGTH) is None
+    assert parse_byte_range("bytes=500-100", LENGTH) is None